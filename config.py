@@ -14,3 +14,15 @@ OWNER_ID = 6849903309
 
 
 HADITH_API_KEY = os.getenv("HADITH_API_KEY")
+
+# طريقة حساب أوقات الصلاة (نفس ترقيم aladhan، 4 = أم القرى)
+PRAYER_METHOD = int(os.getenv("PRAYER_METHOD", "4"))
+
+# حجم خلية الشبكة (بالدرجات) لمشاركة جدول الأوقات بين المستخدمين المتقاربين
+PRAYER_GRID_DEG = float(os.getenv("PRAYER_GRID_DEG", "0.05"))
+
+# قناة خاصة تُرفع إليها ملفات التلاوة مسبقًا لتعبئة ذاكرة file_id (اختياري)
+AUDIO_CACHE_CHANNEL_ID = int(os.getenv("AUDIO_CACHE_CHANNEL_ID")) if os.getenv("AUDIO_CACHE_CHANNEL_ID") else None
+
+# حفظ مراجع أجزاء الأحاديث الطويلة في Mongo أيضًا (1 = نعم) حتى تعمل بعد إعادة التشغيل
+HADITH_CONTINUATION_SPILL = os.getenv("HADITH_CONTINUATION_SPILL", "1") == "1"
@@ -1,32 +1,42 @@
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
-from utils.db import is_admin, add_admin, remove_admin, get_bot_stats, get_admins, get_all_user_ids
+from utils.db import is_admin, add_admin, remove_admin, get_bot_stats, get_admins
+from utils.timetable_cache import cache_stats
+from utils.hadith_data import hadith_cache_stats
+from utils.render_cache import render_stats
+from tasks.broadcasts import create_broadcast_job, start_broadcast_job
 from config import OWNER_ID
+from utils.router import router
 
 broadcast_cache = {}
 
 def register(bot):
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("admin:"))
-    def handle_admin_actions(call: CallbackQuery):
+    @router.route("admin")
+    def handle_admin_actions(call: CallbackQuery, action, *args):
         bot.answer_callback_query(call.id)
-        data = call.data.split(":")
 
-        if data[1] == "menu":
+        if action == "menu":
             show_admin_menu(bot, call.message.chat.id, call.message.message_id)
 
-        elif data[1] == "stats":
+        elif action == "stats":
             stats = get_bot_stats()
             msg = f"📊 إحصائيات البوت:\n\n👤 المستخدمون: {stats['total_users']}\n⭐ المفضلة: {stats['total_favorites']}\n📝 الشكاوى: {stats['total_complaints']}"
+            tt = cache_stats()
+            msg += f"\n\n🕌 ذاكرة أوقات الصلاة (خلية {tt['cell_deg']}°): {tt['hits']} إصابة / {tt['misses']} إخفاق ({tt['hit_ratio']:.0%})، {tt['size']} جدول"
+            for hc in hadith_cache_stats():
+                msg += f"\n📜 ذاكرة {hc['name']}: {hc['hits'] + hc['shared']} إصابة / {hc['misses']} إخفاق ({hc['hit_ratio']:.0%})، {hc['size']}/{hc['max_size']}"
+            for rc in render_stats():
+                msg += f"\n🖼️ بطاقات {rc['name']}: {rc['hit_ratio']:.0%} إصابة، {rc['size']} بطاقة، متوسط البناء {rc['avg_render_ms']:.2f} ms"
             back_button = InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 عودة", callback_data="admin:menu"))
             bot.edit_message_text(msg, call.message.chat.id, call.message.message_id, reply_markup=back_button)
 
-        elif data[1] == "add":
+        elif action == "add":
             if call.from_user.id != OWNER_ID:
                 bot.answer_callback_query(call.id, "❌ فقط مالك البوت يمكنه إضافة مشرفين.", show_alert=True)
                 return
             msg = bot.send_message(call.message.chat.id, "🆔 أرسل معرف المستخدم أو رقمه لإضافته كمشرف:")
             bot.register_next_step_handler(msg, lambda m: process_add_admin(bot, m))
 
-        elif data[1] == "list":
+        elif action == "list":
             admins = get_admins()
             if not admins:
                 bot.edit_message_text("❌ لا يوجد مشرفون حالياً.", call.message.chat.id, call.message.message_id)
@@ -45,8 +55,8 @@ def register(bot):
             markup.add(InlineKeyboardButton("🔙 عودة", callback_data="admin:menu"))
             bot.edit_message_text("👥 قائمة المشرفين:", call.message.chat.id, call.message.message_id, reply_markup=markup)
 
-        elif data[1] == "remove":
-            target_id = data[2]
+        elif action == "remove":
+            target_id = args[0]
             if str(call.from_user.id) != str(OWNER_ID):
                 bot.answer_callback_query(call.id, "❌ فقط مالك البوت يمكنه إزالة مشرفين.", show_alert=True)
                 return
@@ -60,14 +70,14 @@ def register(bot):
             else:
                 bot.answer_callback_query(call.id, "❌ فشل في إزالة المشرف.")
 
-    @bot.callback_query_handler(func=lambda call: call.data == "broadcast:start")
+    @router.route("broadcast:start")
     def start_broadcast(call):
         if not is_admin(call.from_user.id):
             return
         msg = bot.send_message(call.message.chat.id, "📝 أرسل الآن الرسالة الجماعية (نص أو صورة أو فيديو أو غيرها):")
         bot.register_next_step_handler(msg, lambda m: preview_broadcast(bot, m))
 
-    @bot.callback_query_handler(func=lambda call: call.data == "broadcast:confirm")
+    @router.route("broadcast:confirm")
     def confirm_broadcast(call):
         if not is_admin(call.from_user.id):
             return
@@ -77,31 +87,12 @@ def register(bot):
             bot.send_message(call.message.chat.id, "❌ لا توجد رسالة لإرسالها.")
             return
 
-        user_ids = get_all_user_ids()
-        sent = 0
-
-        for user_id in user_ids:
-            try:
-                if content['type'] == 'text':
-                    bot.send_message(user_id, content['text'])
-                elif content['type'] == 'photo':
-                    bot.send_photo(user_id, content['file_id'], caption=content['caption'])
-                elif content['type'] == 'video':
-                    bot.send_video(user_id, content['file_id'], caption=content['caption'])
-                elif content['type'] == 'voice':
-                    bot.send_voice(user_id, content['file_id'], caption=content['caption'])
-                elif content['type'] == 'document':
-                    bot.send_document(user_id, content['file_id'], caption=content['caption'])
-                elif content['type'] == 'sticker':
-                    bot.send_sticker(user_id, content['file_id'])
-                sent += 1
-            except:
-                continue
-
-        bot.send_message(call.message.chat.id, f"✅ تم إرسال الرسالة إلى {sent} مستخدم.")
+        # المهمة تُحفظ في القاعدة وتعمل في الخلفية مع رسالة تقدم تتحدث تلقائيًا
+        job = create_broadcast_job(bot, call.message.chat.id, content)
         del broadcast_cache[call.from_user.id]
+        start_broadcast_job(bot, job["_id"])
 
-    @bot.callback_query_handler(func=lambda call: call.data == "broadcast:cancel")
+    @router.route("broadcast:cancel")
     def cancel_broadcast(call):
         if not is_admin(call.from_user.id):
             return
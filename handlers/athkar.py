@@ -1,24 +1,17 @@
-import requests
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from utils.db import add_to_fav
+from utils.athkar_data import DATASETS, CATEGORY_TITLES, get_athkar, get_dataset, resolve_category
+from utils.render_cache import RenderCache
 import logging
-from utils.menu import show_main_menu
+from utils.router import router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-ATHKAR_CATEGORIES = {
-    "الصباح": "https://ahegazy.github.io/muslimKit/json/azkar_sabah.json",
-    "المساء": "https://ahegazy.github.io/muslimKit/json/azkar_massa.json",
-    "بعد الصلاة": "https://ahegazy.github.io/muslimKit/json/PostPrayer_azkar.json"
-}
-
-athkar_cache = {}
-
 def show_athkar_menu(bot, chat_id, message_id=None):
     markup = InlineKeyboardMarkup(row_width=2)
-    for cat in ATHKAR_CATEGORIES:
-        markup.add(InlineKeyboardButton(f"📿 {cat}", callback_data=f"athkar_cat:{cat}"))
+    for name in DATASETS:
+        markup.add(InlineKeyboardButton(f"📿 {CATEGORY_TITLES[name]}", callback_data=f"athkar_cat:{name}"))
     markup.add(InlineKeyboardButton("🏠 الرجوع للقائمة الرئيسية", callback_data="main_menu"))
 
     try:
@@ -34,19 +27,11 @@ def register(bot):
     def handle_menu_command(msg):
         show_athkar_menu(bot, msg.chat.id)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("athkar_cat:"))
-    def handle_category(call):
-        category = call.data.split(":")[1]
+    @router.route("athkar_cat")
+    def handle_category(call, category):
+        category = resolve_category(category)
         try:
-            if category not in athkar_cache:
-                url = ATHKAR_CATEGORIES[category]
-                res = requests.get(url, timeout=10)
-                res.raise_for_status()
-                data = res.json()
-                athkar_list = data.get("content", [])
-                athkar_cache[category] = athkar_list
-            else:
-                athkar_list = athkar_cache[category]
+            athkar_list = get_athkar(category) if category else []
 
             if not athkar_list:
                 bot.edit_message_text("❌ لا توجد أذكار متاحة.", call.message.chat.id, call.message.message_id)
@@ -57,18 +42,21 @@ def register(bot):
             logger.error(f"[ERROR] تحميل الأذكار: {e}")
             bot.edit_message_text("❌ فشل تحميل الأذكار.", call.message.chat.id, call.message.message_id)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("athkar_nav:"))
-    def navigate_athkar(call):
-        _, category, index = call.data.split(":")
+    @router.route("athkar_nav")
+    def navigate_athkar(call, category, index):
         index = int(index)
+        category = resolve_category(category)
         send_athkar_by_index(bot, call.message.chat.id, category, index, call.message.message_id, edit=True)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav_athkar:"))
-    def add_to_favorites(call):
+    @router.route("fav_athkar")
+    def add_to_favorites(call, category, index):
         try:
-            _, category, index = call.data.split(":")
             index = int(index)
-            item = athkar_cache[category][index]
+            athkar_list = get_athkar(resolve_category(category))
+            if not 0 <= index < len(athkar_list):
+                bot.answer_callback_query(call.id, "❌ لم يتم العثور على الذكر.")
+                return
+            item = athkar_list[index]
 
             text = item.get("zekr", "").strip()
             count = item.get("repeat", "")
@@ -90,47 +78,53 @@ def register(bot):
             logger.error(f"[ERROR] حفظ المفضلة: {e}")
             bot.answer_callback_query(call.id, "❌ فشل الحفظ.")
 
-    @bot.callback_query_handler(func=lambda call: call.data == "athkar_main")
+    @router.route("athkar_main")
     def return_to_athkar_main(call):
         show_athkar_menu(bot, call.message.chat.id, call.message.message_id)
 
-    @bot.callback_query_handler(func=lambda call: call.data == "main_menu")
-    def return_to_main_menu(call):
-        show_main_menu(bot, call.message)
+# 🖼️ بطاقة الذكر ثابتة لكل (قسم، نسخة المحتوى، موضع)
+athkar_cards = RenderCache("athkar_cards")
+
+def render_athkar_card(category, index, athkar_list):
+    item = athkar_list[index]
+    text = item.get("zekr", "").strip()
+    count = item.get("repeat", "")
+    reference = item.get("reference", "") or item.get("bless", "")
+
+    final_text = f"📿 *{CATEGORY_TITLES[category]}*\n\n{text}"
+    if count:
+        final_text += f"\n\n📌 التكرار: {count}"
+    if reference:
+        final_text += f"\n📖 المرجع: {reference}"
+
+    markup = InlineKeyboardMarkup()
+    nav_buttons = []
+    if index > 0:
+        nav_buttons.append(InlineKeyboardButton("◀️ السابق", callback_data=f"athkar_nav:{category}:{index - 1}"))
+    if index < len(athkar_list) - 1:
+        nav_buttons.append(InlineKeyboardButton("▶️ التالي", callback_data=f"athkar_nav:{category}:{index + 1}"))
+    if nav_buttons:
+        markup.row(*nav_buttons)
+
+    markup.row(InlineKeyboardButton("⭐ إضافة للمفضلة", callback_data=f"fav_athkar:{category}:{index}"))
+    markup.row(
+        InlineKeyboardButton("🔙 الرجوع للقائمة السابقة", callback_data="athkar_main"),
+        InlineKeyboardButton("🏠 الرجوع للرئيسية", callback_data="main_menu")
+    )
+    return final_text, markup
 
 def send_athkar_by_index(bot, chat_id, category, index, message_id=None, edit=False):
     try:
-        athkar_list = athkar_cache.get(category, [])
+        entry = get_dataset(category) if category in DATASETS else None
+        athkar_list = entry["content"] if entry else []
         if not athkar_list or not (0 <= index < len(athkar_list)):
             bot.send_message(chat_id, "❌ لا يوجد ذكر في هذا الموضع.")
             return
 
-        item = athkar_list[index]
-        text = item.get("zekr", "").strip()
-        count = item.get("repeat", "")
-        reference = item.get("reference", "") or item.get("bless", "")
-
-        final_text = f"📿 *{category}*\n\n{text}"
-        if count:
-            final_text += f"\n\n📌 التكرار: {count}"
-        if reference:
-            final_text += f"\n📖 المرجع: {reference}"
-
-        markup = InlineKeyboardMarkup()
-        nav_buttons = []
-        if index > 0:
-            nav_buttons.append(InlineKeyboardButton("◀️ السابق", callback_data=f"athkar_nav:{category}:{index - 1}"))
-        if index < len(athkar_list) - 1:
-            nav_buttons.append(InlineKeyboardButton("▶️ التالي", callback_data=f"athkar_nav:{category}:{index + 1}"))
-        if nav_buttons:
-            markup.row(*nav_buttons)
-
-        markup.row(InlineKeyboardButton("⭐ إضافة للمفضلة", callback_data=f"fav_athkar:{category}:{index}"))
-        markup.row(
-            InlineKeyboardButton("🔙 الرجوع للقائمة السابقة", callback_data="athkar_main"),
-            InlineKeyboardButton("🏠 الرجوع للرئيسية", callback_data="main_menu")
+        final_text, markup = athkar_cards.get(
+            (category, entry["version"], index),
+            lambda: render_athkar_card(category, index, athkar_list)
         )
-
         if edit and message_id:
             bot.edit_message_text(final_text, chat_id, message_id, reply_markup=markup, parse_mode="Markdown")
         else:
@@ -2,6 +2,8 @@ from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from bson import ObjectId
 from datetime import datetime
 from utils.db import comp_col, get_admins, is_admin
+from utils.sender import send
+from utils.router import router
 
 def show_complaint_menu(bot, chat_id, message_id):
     markup = InlineKeyboardMarkup()
@@ -14,9 +16,8 @@ def show_complaint_menu(bot, chat_id, message_id):
 
 
 def register(bot):
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("start_complaint:"))
-    def ask_for_input(call):
-        ctype = call.data.split(":")[1]
+    @router.route("start_complaint")
+    def ask_for_input(call, ctype):
         bot.send_message(call.message.chat.id, f"📝 أرسل {'شكواك' if ctype == 'complaint' else 'اقتراحك'} الآن (نص، صورة، صوت، فيديو...).")
         bot.register_next_step_handler(call.message, lambda m: save_complaint(bot, m, ctype))
 
@@ -62,15 +63,16 @@ def register(bot):
         bot.send_message(msg.chat.id, "✅ تم إرسال الرسالة بنجاح. شكرًا لك!")
 
         for admin in get_admins():
-            bot.send_message(
+            send(
+                "send_message",
                 admin["_id"],
                 f"📬 {'شكوى' if ctype == 'complaint' else 'اقتراح'} جديدة من @{data['username']}\n👁️ استخدم /complaints لعرضها."
             )
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("view_my_complaints:"))
-    def view_my_complaints(call):
+    @router.route("view_my_complaints")
+    def view_my_complaints(call, index):
         bot.answer_callback_query(call.id)
-        index = int(call.data.split(":")[1])
+        index = int(index)
         user_id = call.from_user.id
         complaints = list(comp_col.find({"user_id": user_id}).sort("_id", -1))
         if not complaints:
@@ -102,11 +104,10 @@ def register(bot):
         markup.row(InlineKeyboardButton("⬅️ رجوع", callback_data="menu:complain"))
         bot.edit_message_text(text, call.message.chat.id, call.message.message_id, reply_markup=markup)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("reply:"))
-    def start_admin_reply(call):
+    @router.route("reply")
+    def start_admin_reply(call, cid):
         if not is_admin(call.from_user.id):
             return
-        cid = call.data.split(":")[1]
         bot.send_message(call.message.chat.id, "📝 اكتب الرد الآن.")
         bot.register_next_step_handler(call.message, lambda m: finish_reply(bot, m, cid))
 
@@ -122,7 +123,7 @@ def register(bot):
         }
 
         comp_col.update_one({"_id": ObjectId(cid)}, {"$push": {"replies": reply_obj}})
-        bot.send_message(complaint["user_id"], f"📬 رد جديد على {'شكواك' if complaint['type'] == 'complaint' else 'اقتراحك'}:\n\n{reply_obj['text']}")
+        send("send_message", complaint["user_id"], f"📬 رد جديد على {'شكواك' if complaint['type'] == 'complaint' else 'اقتراحك'}:\n\n{reply_obj['text']}")
         bot.send_message(msg.chat.id, "✅ تم إرسال الرد للمستخدم.")
 
 
@@ -174,18 +175,17 @@ def handle_callbacks(bot):
         else:
             bot.send_message(chat_id, text, reply_markup=markup)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("admin_next:") or call.data.startswith("admin_prev:"))
-    def navigate_complaints(call):
-        index = int(call.data.split(":")[1])
+    @router.route("admin_next", "admin_prev")
+    def navigate_complaints(call, index):
+        index = int(index)
         complaints = list(comp_col.find({"status": "open"}).sort("_id", -1))
         bot.answer_callback_query(call.id)
         send_complaint(bot, call.message.chat.id, complaints, index)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("close:"))
-    def close_complaint(call):
+    @router.route("close")
+    def close_complaint(call, cid):
         if not is_admin(call.from_user.id):
             return
-        cid = call.data.split(":")[1]
         comp_col.update_one({"_id": ObjectId(cid)}, {"$set": {"status": "closed"}})
         bot.answer_callback_query(call.id, "✅ تم إغلاق الشكوى.")
         bot.edit_message_text("✅ تم إغلاق هذه الشكوى.", call.message.chat.id, call.message.message_id)
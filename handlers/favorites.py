@@ -1,6 +1,7 @@
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from utils.db import user_col
 from math import ceil
+from utils.router import router
 
 ITEMS_PER_PAGE = 3
 
@@ -21,13 +22,8 @@ def register(bot):
         "athkar": "athkar"
     }
 
-    @bot.callback_query_handler(func=lambda call: call.data == "menu:fav")
-    def open_favorites_main(call):
-        show_fav_main_menu(bot, call.message.chat.id, call.message.message_id)
-
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav_section:"))
-    def show_fav_section(call):
-        section = call.data.split(":")[1]
+    @router.route("fav_section")
+    def show_fav_section(call, section):
         show_fav_page(bot, call.message.chat.id, call.message.message_id, section, 0)
 
     def show_fav_page(bot, chat_id, message_id, section, page):
@@ -73,14 +69,12 @@ def register(bot):
 
         bot.edit_message_text(text, chat_id, message_id, reply_markup=markup, parse_mode="Markdown")
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav_page:"))
-    def change_page(call):
-        _, section, page = call.data.split(":")
+    @router.route("fav_page")
+    def change_page(call, section, page):
         show_fav_page(bot, call.message.chat.id, call.message.message_id, section, int(page))
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav_delete_menu:"))
-    def delete_menu(call):
-        _, section, page = call.data.split(":")
+    @router.route("fav_delete_menu")
+    def delete_menu(call, section, page):
         page = int(page)
         user = user_col.find_one({"_id": call.message.chat.id})
         if not user or "favorites" not in user:
@@ -99,9 +93,8 @@ def register(bot):
         markup.add(InlineKeyboardButton("⬅️ رجوع", callback_data=f"fav_page:{section}:{page}"))
         bot.edit_message_text("🗑️ اختر العنصر الذي تريد حذفه:", call.message.chat.id, call.message.message_id, reply_markup=markup)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav_delete:"))
-    def delete_favorite(call):
-        _, section, index, page = call.data.split(":")
+    @router.route("fav_delete")
+    def delete_favorite(call, section, index, page):
         index = int(index)
         user_col.update_one({"_id": call.message.chat.id}, {"$unset": {f"favorites.{index}": 1}})
         user_col.update_one({"_id": call.message.chat.id}, {"$pull": {"favorites": None}})
@@ -1,58 +1,113 @@
-import requests
+import re
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-from config import HADITH_API_KEY
-from utils.db import add_to_fav
-from utils.menu import show_main_menu
+from config import HADITH_CONTINUATION_SPILL
+from utils.db import db, add_to_fav
+from utils.router import router, callback_data
+from utils.hadith_data import PAGE_TTL, get_books, get_hadith_page, get_book_meta, book_version, locate_hadith, random_position
+from utils.prefetch import prefetcher
+from utils.continuations import ContinuationStore
+from utils.render_cache import RenderCache
+from utils.hadith_search import search_hadith, indexed_count, PAGE_SIZE
+from collections import OrderedDict
 
-BASE_URL = "https://www.hadithapi.com/public/api"
+# عدد مرات سحب موضع عشوائي قبل اعتبار الكتاب فارغًا
+RANDOM_ATTEMPTS = 5
 
-headers = {
-    "Accept": "application/json",
-    "User-Agent": "Mozilla/5.0"
-}
+# عدد الأحاديث قبل نهاية الصفحة الذي نبدأ عنده تحميل الصفحة المجاورة مسبقًا
+PREFETCH_MARGIN = 3
 
-params_base = {
-    "apiKey": HADITH_API_KEY,
-    "language": "arabic"
-}
+# حد تيليجرام 4096 حرفًا، نترك مجالًا لعنوان الجزء
+PART_SIZE = 4000
+_HADITH_NUMBER = re.compile(r"حديث رقم (\S+)")
 
-long_hadith_parts = {}
+# لكل رسالة حديث طويل: (الكتاب، الصفحة، الموضع) فقط، والأجزاء تُعاد من ذاكرة الصفحات
+long_hadiths = ContinuationStore(
+    "hadith_continuations",
+    collection=db["hadith_continuations"] if HADITH_CONTINUATION_SPILL else None
+)
+long_hadiths.ensure_indexes()
+
+# 🖼️ بطاقة الحديث لكل (كتاب، صفحة، موضع، جزء، إصدار الكتاب)، بنفس مدة صلاحية ذاكرة الصفحات
+hadith_cards = RenderCache("hadith_cards", max_size=5000, ttl=PAGE_TTL)
+
+# آخر بحث لكل محادثة (النص، الكتاب، الراوي) لأزرار الصفحات، بحد أقصى
+MAX_SEARCH_SESSIONS = 5000
+last_searches = OrderedDict()
+
+def remember_search(chat_id, search):
+    last_searches[chat_id] = search
+    last_searches.move_to_end(chat_id)
+    while len(last_searches) > MAX_SEARCH_SESSIONS:
+        last_searches.popitem(last=False)
+
+# 🔍 /hsearch نص البحث كتاب:sahih-bukhari راوي:أبي_هريرة
+def parse_search(text, book_slug=None):
+    words, narrator = [], None
+    for word in text.split():
+        key, _, value = word.partition(":")
+        if value and key in ("كتاب", "book"):
+            book_slug = value
+        elif value and key in ("راوي", "narrator"):
+            narrator = value.replace("_", " ")
+        else:
+            words.append(word)
+    return {"query": " ".join(words), "book": book_slug, "narrator": narrator}
 
 def register(bot):
     @bot.message_handler(commands=['hadith'])
     def show_hadith_menu_command(msg):
         show_books(bot, msg)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("hadith:"))
-    def handle_callback(call):
+    @bot.message_handler(commands=['hsearch'])
+    def hadith_search_command(msg):
+        parts = msg.text.split(maxsplit=1)
+        if len(parts) > 1 and parts[1].strip():
+            run_hadith_search(bot, msg.chat.id, parse_search(parts[1]))
+        else:
+            prompt = bot.send_message(msg.chat.id, SEARCH_PROMPT)
+            bot.register_next_step_handler(prompt, lambda m: process_search_text(bot, m))
+
+    @router.route("hadith")
+    def handle_callback(call, action, *args):
         bot.answer_callback_query(call.id)
-        data = call.data.split(":")
-        action = data[1]
 
         if action == "menu":
             show_books(bot, call.message)
 
         elif action == "book":
-            book_slug = data[2]
-            book_name = data[3]
-            show_book_options(bot, call.message, book_slug, book_name)
+            book_slug = args[0]
+            show_book_options(bot, call.message, book_slug)
 
         elif action == "random":
-            book_slug = data[2]
+            book_slug = args[0]
             send_random_hadith(bot, call.message, book_slug)
 
         elif action == "bynumber":
-            book_slug = data[2]
+            book_slug = args[0]
             msg = bot.send_message(call.message.chat.id, "📃 أدخل رقم الحديث:")
             bot.register_next_step_handler(msg, lambda m: send_hadith_by_number(bot, m, book_slug, call.message))
 
+        elif action == "find":
+            book_slug = args[0] if args else None
+            msg = bot.send_message(call.message.chat.id, SEARCH_PROMPT)
+            bot.register_next_step_handler(msg, lambda m: process_search_text(bot, m, book_slug))
+
+        elif action == "search":
+            search = last_searches.get(call.message.chat.id)
+            if not search:
+                bot.send_message(call.message.chat.id, "⚠️ انتهت جلسة البحث، ابحث من جديد.")
+                return
+            send_search_results(bot, call.message.chat.id, search, int(args[0]), call.message.message_id)
+
         elif action == "page":
-            book_slug, page, index = data[2], int(data[3]), int(data[4])
+            book_slug, page, index = args[0], int(args[1]), int(args[2])
             show_hadith_by_index(bot, call.message, book_slug, page, index)
 
         elif action == "fav":
             user_id = call.from_user.id
-            text = call.message.text or call.message.caption or ""
+            ref = long_hadiths.get(call.message.chat.id, call.message.message_id)
+            hadith = ref_hadith(ref, call.message)
+            text = hadith_full_text(hadith) if hadith else (call.message.text or call.message.caption or "")
             if text:
                 add_to_fav(user_id, "hadith", text)
                 bot.answer_callback_query(call.id, "✅ تم حفظ الحديث في المفضلة")
@@ -60,14 +115,13 @@ def register(bot):
                 bot.answer_callback_query(call.id, "❌ لا يمكن حفظ هذا الحديث")
 
         elif action == "more":
-            key = f"{call.message.chat.id}:{call.message.message_id}"
-            parts = long_hadith_parts.get(key)
-            if parts:
-                markup = call.message.reply_markup
-                try:
-                    bot.edit_message_text(parts[1], call.message.chat.id, call.message.message_id, reply_markup=markup)
-                except:
-                    bot.send_message(call.message.chat.id, parts[1], reply_markup=markup)
+            ref = long_hadiths.get(call.message.chat.id, call.message.message_id)
+            hadith = ref_hadith(ref, call.message)
+            if not hadith:
+                bot.send_message(call.message.chat.id, "⚠️ انتهت صلاحية هذه الرسالة، افتح الحديث من جديد.")
+                return
+            book_slug, page, index = ref
+            send_hadith(bot, call.message, hadith, book_slug, page, index, part=int(args[0]) if args else 1)
 
 def arabic_book_name(english_name):
     names = {
@@ -83,61 +137,130 @@ def arabic_book_name(english_name):
     }
     return names.get(english_name, english_name)
 
+SEARCH_PROMPT = (
+    "🔍 أرسل كلمات من نص الحديث:\n"
+    "• ضع العبارة بين \"...\" للبحث عنها متتالية\n"
+    "• لتحديد الراوي: راوي:أبي_هريرة"
+)
+
+def book_title(book_slug):
+    for book in get_books():
+        if book['bookSlug'] == book_slug:
+            return arabic_book_name(book['bookName'])
+    return book_slug
+
+def process_search_text(bot, msg, book_slug=None):
+    if not msg.text or not msg.text.strip():
+        bot.send_message(msg.chat.id, "❌ يرجى إرسال نص للبحث")
+        return
+    run_hadith_search(bot, msg.chat.id, parse_search(msg.text, book_slug))
+
+def run_hadith_search(bot, chat_id, search):
+    if not search["query"]:
+        bot.send_message(chat_id, "❌ يرجى إرسال نص للبحث")
+        return
+    remember_search(chat_id, search)
+    send_search_results(bot, chat_id, search, 0)
+
+def send_search_results(bot, chat_id, search, page, message_id=None):
+    try:
+        results, total = search_hadith(search["query"], search["book"], search["narrator"], page)
+    except Exception as e:
+        bot.send_message(chat_id, f"⚠️ خطأ: {e}")
+        return
+
+    scope = book_title(search["book"]) if search["book"] else "كل الكتب"
+    if search["narrator"]:
+        scope += f" — الراوي: {search['narrator']}"
+    markup = InlineKeyboardMarkup()
+    if not total:
+        text = f"🔍 لا توجد نتائج لـ: {search['query']}\n📚 {scope}\n(الأحاديث المفهرسة: {indexed_count()})"
+    else:
+        pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+        text = f"🔍 نتائج البحث عن: {search['query']}\n📚 {scope}\nعدد الأحاديث: {total} (صفحة {page + 1}/{pages})\n\n"
+        for item in results:
+            hadith = item["hadith"]
+            number = hadith.get('hadithNumber') or hadith['id']
+            body = hadith.get('hadithArabic', '')
+            body = body if len(body) <= 200 else body[:200] + "…"
+            text += f"📘 {book_title(item['book'])} ({number}):\n{body}\n\n"
+            markup.add(InlineKeyboardButton(
+                f"📌 {book_title(item['book'])} - {number}",
+                callback_data=callback_data("hadith:page", item['book'], item['page'], item['index'])
+            ))
+        nav = []
+        if page > 0:
+            nav.append(InlineKeyboardButton("◀️ السابق", callback_data=f"hadith:search:{page - 1}"))
+        if page + 1 < pages:
+            nav.append(InlineKeyboardButton("▶️ التالي", callback_data=f"hadith:search:{page + 1}"))
+        if nav:
+            markup.row(*nav)
+    markup.add(InlineKeyboardButton("📚 الكتب", callback_data="hadith:menu"))
+
+    if message_id:
+        bot.edit_message_text(text, chat_id, message_id, reply_markup=markup)
+    else:
+        bot.send_message(chat_id, text, reply_markup=markup)
+
 def show_books(bot, msg):
     try:
-        res = requests.get(f"{BASE_URL}/books", params=params_base, headers=headers)
-        books = res.json().get("books", [])
+        books = get_books()
         markup = InlineKeyboardMarkup(row_width=2)
         for book in books:
             name_ar = arabic_book_name(book['bookName'])
             markup.add(
                 InlineKeyboardButton(
                     f"📘 {name_ar}", 
-                    callback_data=f"hadith:book:{book['bookSlug']}:{book['bookName']}"
+                    callback_data=callback_data("hadith:book", book['bookSlug'])
                 )
             )
+        markup.add(InlineKeyboardButton("🔍 البحث في الأحاديث", callback_data="hadith:find"))
         markup.add(InlineKeyboardButton("🏠 العودة إلى الرئيسية", callback_data="back_to_main"))
         bot.edit_message_text("📚 اختر كتاب الحديث:", msg.chat.id, msg.message_id, reply_markup=markup)
     except Exception as e:
         bot.send_message(msg.chat.id, f"❌ خطأ: {e}")
 
-def show_book_options(bot, msg, book_slug, book_name):
+def show_book_options(bot, msg, book_slug):
     markup = InlineKeyboardMarkup()
     markup.add(
-        InlineKeyboardButton("🎲 حديث عشوائي", callback_data=f"hadith:random:{book_slug}"),
-        InlineKeyboardButton("🔢 حديث برقم", callback_data=f"hadith:bynumber:{book_slug}"),
+        InlineKeyboardButton("🎲 حديث عشوائي", callback_data=callback_data("hadith:random", book_slug)),
+        InlineKeyboardButton("🔢 حديث برقم", callback_data=callback_data("hadith:bynumber", book_slug)),
     )
+    markup.add(InlineKeyboardButton("🔍 بحث في هذا الكتاب", callback_data=callback_data("hadith:find", book_slug)))
     markup.add(InlineKeyboardButton("⬅️ العودة", callback_data="hadith:menu"))
-    bot.edit_message_text("📘 اختر الطريقة:", msg.chat.id, msg.message_id, reply_markup=markup)
+    bot.edit_message_text(f"📘 {book_title(book_slug)} - اختر الطريقة:", msg.chat.id, msg.message_id, reply_markup=markup)
 
+# 🎲 الموضع قد يقع خارج صفحة أقصر من per_page (آخر صفحة أو صفحة ناقصة)، فنسحب من جديد
+# بدل تقريبه لآخر حديث في الصفحة حتى يبقى التوزيع متساويًا
 def send_random_hadith(bot, msg, book_slug):
     try:
-        res = requests.get(f"{BASE_URL}/hadiths", params={**params_base, "book": book_slug, "page": 1}, headers=headers)
-        hadiths = res.json().get("hadiths", {}).get("data", [])
-        if not hadiths:
-            bot.edit_message_text("❌ لا توجد أحاديث في هذا الكتاب.", msg.chat.id, msg.message_id)
-            return
-        import random
-        hadith = random.choice(hadiths)
-        send_hadith(bot, msg, hadith, book_slug, page=1, index=hadiths.index(hadith))
+        for _ in range(RANDOM_ATTEMPTS):
+            position = random_position(book_slug)
+            if not position:
+                break
+            page, index = position
+            hadiths = get_hadith_page(book_slug, page)["data"]
+            if index < len(hadiths):
+                send_hadith(bot, msg, hadiths[index], book_slug, page=page, index=index)
+                return
+        bot.edit_message_text("❌ لا توجد أحاديث في هذا الكتاب.", msg.chat.id, msg.message_id)
     except Exception as e:
         bot.edit_message_text(f"⚠️ خطأ: {e}", msg.chat.id, msg.message_id)
 
 def send_hadith_by_number(bot, msg, book_slug, origin_msg):
     try:
-        number = int(msg.text.strip())
-        page = (number - 1) // 25 + 1
-        index = (number - 1) % 25
+        position = locate_hadith(book_slug, msg.text.strip())
         bot.delete_message(msg.chat.id, msg.message_id)
-        show_hadith_by_index(bot, origin_msg, book_slug, page, index)
+        if not position:
+            bot.send_message(msg.chat.id, "❌ لا يوجد حديث بهذا الرقم.")
+            return
+        show_hadith_by_index(bot, origin_msg, book_slug, *position)
     except Exception as e:
         bot.send_message(msg.chat.id, f"⚠️ خطأ: {e}")
 
 def show_hadith_by_index(bot, msg, book_slug, page, index):
     try:
-        res = requests.get(f"{BASE_URL}/hadiths", params={**params_base, "book": book_slug, "page": page}, headers=headers)
-        data = res.json().get("hadiths", {})
-        hadiths = data.get("data", [])
+        hadiths = get_hadith_page(book_slug, page)["data"]
         if index >= len(hadiths):
             bot.send_message(msg.chat.id, "❌ لا يوجد حديث بهذا الرقم.")
             return
@@ -146,22 +269,57 @@ def show_hadith_by_index(bot, msg, book_slug, page, index):
     except Exception as e:
         bot.send_message(msg.chat.id, f"⚠️ خطأ: {e}")
 
-def send_hadith(bot, msg, hadith, book_slug, page, index):
-    full_text = f"📌 حديث رقم {hadith['id']}\n\n{hadith.get('hadithArabic', '❌ لا يوجد نص')}"
+def hadith_number(hadith):
+    return str(hadith.get('hadithNumber') or hadith['id'])
+
+def hadith_full_text(hadith):
+    return f"📌 حديث رقم {hadith_number(hadith)}\n\n{hadith.get('hadithArabic', '❌ لا يوجد نص')}"
+
+# الحديث الذي يشير إليه مرجع محفوظ، أو None إذا لم يعد موجودًا (تغيّرت الصفحة بعد مزامنة)
+# أو إذا كانت الرسالة تعرض الآن حديثًا آخر (رقمه في رأس الرسالة لا يطابق المرجع)
+def ref_hadith(ref, message):
+    if not ref:
+        return None
+    book_slug, page, index = ref
+    hadiths = get_hadith_page(book_slug, page)["data"]
+    if not 0 <= index < len(hadiths):
+        return None
+    shown = _HADITH_NUMBER.search(message.text or message.caption or "")
+    if not shown or shown.group(1) != hadith_number(hadiths[index]):
+        return None
+    return hadiths[index]
+
+# ✂️ تقسيم النص إلى أجزاء لا تتجاوز PART_SIZE، عند آخر مسافة إن أمكن
+def split_parts(text, size=PART_SIZE):
+    parts = []
+    while len(text) > size:
+        cut = text.rfind(" ", size // 2, size)
+        cut = cut if cut > 0 else size
+        parts.append(text[:cut])
+        text = text[cut:].lstrip()
+    parts.append(text)
+    return parts
+
+def render_hadith_card(hadith, book_slug, page, index, part):
+    parts = split_parts(hadith_full_text(hadith))
+    part = min(max(part, 0), len(parts) - 1)
     markup = InlineKeyboardMarkup(row_width=2)
 
     prev_index = index - 1
     next_index = index + 1
 
+    meta = get_book_meta(book_slug)
+    page_len = len(get_hadith_page(book_slug, page)["data"])
+
     if prev_index >= 0:
-        markup.add(InlineKeyboardButton("⬅️ السابق", callback_data=f"hadith:page:{book_slug}:{page}:{prev_index}"))
+        markup.add(InlineKeyboardButton("⬅️ السابق", callback_data=callback_data("hadith:page", book_slug, page, prev_index)))
     elif page > 1:
-        markup.add(InlineKeyboardButton("⬅️ السابق", callback_data=f"hadith:page:{book_slug}:{page - 1}:24"))
+        markup.add(InlineKeyboardButton("⬅️ السابق", callback_data=callback_data("hadith:page", book_slug, page - 1, meta['per_page'] - 1)))
 
-    if next_index < 25:
-        markup.add(InlineKeyboardButton("➡️ التالي", callback_data=f"hadith:page:{book_slug}:{page}:{next_index}"))
-    else:
-        markup.add(InlineKeyboardButton("➡️ التالي", callback_data=f"hadith:page:{book_slug}:{page + 1}:0"))
+    if next_index < page_len:
+        markup.add(InlineKeyboardButton("➡️ التالي", callback_data=callback_data("hadith:page", book_slug, page, next_index)))
+    elif page < meta["last_page"]:
+        markup.add(InlineKeyboardButton("➡️ التالي", callback_data=callback_data("hadith:page", book_slug, page + 1, 0)))
 
     markup.add(
         InlineKeyboardButton("⭐ إضافة للمفضلة", callback_data="hadith:fav"),
@@ -169,20 +327,43 @@ def send_hadith(bot, msg, hadith, book_slug, page, index):
         InlineKeyboardButton("🏠 العودة إلى الرئيسية", callback_data="back_to_main")
     )
 
-    parts = [full_text[i:i+4000] for i in range(0, len(full_text), 4000)]
-    key = f"{msg.chat.id}:{msg.message_id}"
-
+    text = parts[part]
     if len(parts) > 1:
-        long_hadith_parts[key] = parts
-        markup.add(InlineKeyboardButton("📖 متابعة القراءة", callback_data="hadith:more"))
+        # رقم الحديث في رأس كل جزء حتى يمكن مطابقة الرسالة بمرجعها المحفوظ
+        header = f"📄 الجزء {part + 1}/{len(parts)}" + (f" · حديث رقم {hadith_number(hadith)}" if part > 0 else "")
+        text = f"{header}\n\n{text}"
+        nav = []
+        if part > 0:
+            nav.append(InlineKeyboardButton("⏮️ الجزء السابق", callback_data=f"hadith:more:{part - 1}"))
+        if part + 1 < len(parts):
+            nav.append(InlineKeyboardButton("📖 متابعة القراءة", callback_data=f"hadith:more:{part + 1}"))
+        markup.row(*nav)
+    return text, markup
+
+def send_hadith(bot, msg, hadith, book_slug, page, index, part=0):
+    text, markup = hadith_cards.get(
+        (book_slug, page, index, part, book_version(book_slug)),
+        lambda: render_hadith_card(hadith, book_slug, page, index, part)
+    )
 
     try:
-        if len(parts[0]) <= 4096:
-            bot.edit_message_text(parts[0], msg.chat.id, msg.message_id, reply_markup=markup)
-        else:
-            raise Exception("Too long to edit")
+        bot.edit_message_text(text, msg.chat.id, msg.message_id, reply_markup=markup)
+        message_id = msg.message_id
     except:
-        bot.send_message(msg.chat.id, parts[0], reply_markup=markup)
+        message_id = bot.send_message(msg.chat.id, text, reply_markup=markup).message_id
+
+    if len(hadith_full_text(hadith)) > PART_SIZE:
+        long_hadiths.put(msg.chat.id, message_id, [book_slug, page, index])
+
+    prefetch_neighbour_page(msg.chat.id, book_slug, page, index)
+
+# ⚡ قرب بداية/نهاية الصفحة: تحميل الصفحة المجاورة في الخلفية قبل الضغط على السابق/التالي
+def prefetch_neighbour_page(user_id, book_slug, page, index):
+    meta = get_book_meta(book_slug)
+    if index >= meta["per_page"] - PREFETCH_MARGIN and page < meta["last_page"]:
+        prefetcher.schedule(user_id, f"hadith:{book_slug}:{page + 1}", get_hadith_page, book_slug, page + 1)
+    elif index < PREFETCH_MARGIN and page > 1:
+        prefetcher.schedule(user_id, f"hadith:{book_slug}:{page - 1}", get_hadith_page, book_slug, page - 1)
 
 def show_hadith_menu(bot, message):
     show_books(bot, message)
@@ -1,5 +1,6 @@
 from telebot.types import ReplyKeyboardMarkup, KeyboardButton
 from utils.db import set_user_location
+from utils.timezones import timezone_at
 
 def register(bot):
     @bot.message_handler(commands=['enable_notifications'])
@@ -18,7 +19,7 @@ def register(bot):
         lat = msg.location.latitude
         lon = msg.location.longitude
 
-        # حفظ الموقع مع وضع 'auto' كوقت مبدئي
-        set_user_location(msg.from_user.id, lat, lon, timezone="auto")
+        # حفظ الموقع مع المنطقة الزمنية المحسوبة محليًا
+        set_user_location(msg.from_user.id, lat, lon, timezone=timezone_at(lat, lon))
 
         bot.send_message(msg.chat.id, "✅ تم حفظ موقعك وتفعيل التنبيهات اليومية بإذن الله.")
@@ -1,17 +1,17 @@
-import requests
-import os
-from dotenv import load_dotenv
 from telebot.types import (
     ReplyKeyboardMarkup,
     KeyboardButton,
     InlineKeyboardMarkup,
     InlineKeyboardButton
 )
-from utils.db import set_user_location, get_user_location
-
-load_dotenv()
-TIMEZONE_API_KEY = os.getenv("TIMEZONE_API_KEY")
-TIMEZONE_API_URL = "http://api.timezonedb.com/v2.1/get-time-zone"
+from utils.db import set_user_location, get_user_location, get_user_timezone
+from utils.prayer_times import resolve_timezone, readable_date
+from utils.timetable_cache import get_timings_cached
+from utils.timezones import timezone_at
+from config import PRAYER_METHOD
+from datetime import datetime
+from pytz import utc
+from utils.router import router
 
 # ✅ تسجيل أوامر الصلاة
 def register(bot):
@@ -24,27 +24,14 @@ def register(bot):
         lat = msg.location.latitude
         lon = msg.location.longitude
 
-        # ✅ جلب المنطقة الزمنية تلقائيًا
-        tz_name = "auto"
-        try:
-            params = {
-                "key": TIMEZONE_API_KEY,
-                "format": "json",
-                "by": "position",
-                "lat": lat,
-                "lng": lon
-            }
-            res = requests.get(TIMEZONE_API_URL, params=params, timeout=10)
-            data = res.json()
-            tz_name = data.get("zoneName", "auto")
-        except Exception as e:
-            print(f"[ERROR] جلب التوقيت المحلي: {e}")
+        # ✅ تحديد المنطقة الزمنية محليًا من الإحداثيات
+        tz_name = timezone_at(lat, lon)
 
         set_user_location(msg.from_user.id, lat, lon, tz_name)
         show_prayer_times(bot, msg)
 
     # ✅ زر تحديث الموقع من داخل البوت
-    @bot.callback_query_handler(func=lambda call: call.data == "update_location")
+    @router.route("update_location")
     def ask_new_location(call):
         markup = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True)
         markup.add(KeyboardButton("📍 إرسال موقعي", request_location=True))
@@ -64,16 +51,10 @@ def show_prayer_times(bot, message):
         )
 
     try:
-        res = requests.get(
-            f"http://api.aladhan.com/v1/timings?latitude={lat}&longitude={lon}&method=4"
-        )
-        data = res.json()
-
-        if data["code"] != 200:
-            raise Exception("❌ فشل في جلب أوقات الصلاة من API.")
-
-        times = data["data"]["timings"]
-        date = data["data"]["date"]["readable"]
+        tz_name = get_user_timezone(message.chat.id)
+        today = datetime.now(utc).astimezone(resolve_timezone(tz_name, lon)).date()
+        times = get_timings_cached(lat, lon, today, tz_name, PRAYER_METHOD)
+        date = readable_date(today)
 
         text = (
             f"🕌 <b>أوقات الصلاة لليوم ({date})</b>\n\n"
@@ -99,5 +80,5 @@ def show_prayer_times(bot, message):
         )
 
     except Exception as e:
-        print(f"[ERROR] Prayer API: {e}")
+        print(f"[ERROR] حساب أوقات الصلاة: {e}")
         bot.send_message(message.chat.id, "❌ حدث خطأ أثناء جلب أوقات الصلاة.")
@@ -1,22 +1,82 @@
-import requests
-import random
+import re
 import logging
+import threading
+from collections import OrderedDict
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-from utils.db import add_to_fav
-from utils.menu import show_main_menu
+from utils.db import add_to_fav, get_user_reciter
+from utils.router import router, callback_data
+from utils.quran_corpus import get_surah, get_ayah, random_ayah
+from utils.audio_cache import send_ayah_audio, queue_ayah_audio, warm_ayah_audio
+from utils.prefetch import prefetcher
+from utils.render_cache import RenderCache
+from config import AUDIO_CACHE_CHANNEL_ID
+from utils.reciters import resolve_reciter, reciter_name, reciter_audio_url
+from utils.quran_search import search_quran, PAGE_SIZE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-API_BASE = "https://api.alquran.cloud/v1"
-HEADERS = {'User-Agent': 'Mozilla/5.0'}
+# آخر عبارة بحث لكل محادثة (لأزرار الصفحات)، بحد أقصى حتى لا تكبر الذاكرة
+MAX_SEARCH_SESSIONS = 5000
+last_queries = OrderedDict()
+
+
+# قوائم تشغيل السور الجارية: chat_id -> حدث الإيقاف
+active_playlists = {}
+playlists_lock = threading.Lock()
+
+
+# 🖼️ بطاقة الآية (النص + الأزرار) ثابتة لكل (آية، زر "آية أخرى")
+ayah_cards = RenderCache("ayah_cards")
+
+
+def render_verse_card(surah, ayah, again):
+    surah_num = surah['number']
+    text = f"📖 سورة {surah['name']}\nالآية {ayah['numberInSurah']}:\n\n{ayah['text']}"
+
+    markup = InlineKeyboardMarkup()
+    markup.row(
+        InlineKeyboardButton("🔁 آية أخرى", callback_data=again),
+        InlineKeyboardButton("🎧 استماع", callback_data=f"listen_audio:{surah_num}:{ayah['numberInSurah']}"),
+        InlineKeyboardButton("⭐ حفظ", callback_data=f"fav:{surah_num}:{ayah['numberInSurah']}")
+    )
+
+    nav = []
+    if ayah['numberInSurah'] > 1:
+        nav.append(InlineKeyboardButton("◀️ السابقة", callback_data=f"nav_{surah_num}_{ayah['numberInSurah'] - 1}"))
+    if ayah['numberInSurah'] < surah['numberOfAyahs']:
+        nav.append(InlineKeyboardButton("▶️ التالية", callback_data=f"nav_{surah_num}_{ayah['numberInSurah'] + 1}"))
+    if nav:
+        markup.row(*nav)
+
+    markup.add(InlineKeyboardButton("🏠 الرئيسية", callback_data="main_menu"))
+    return text, markup
+
+
+# ⚡ بعد عرض آية: تجهيز تلاوة الآية التالية بقارئ المستخدم (يتطلب قناة ذاكرة الصوت)
+def prefetch_next_ayah(user_id, surah, ayah):
+    if not AUDIO_CACHE_CHANNEL_ID or ayah['numberInSurah'] >= surah['numberOfAyahs']:
+        return
+
+    def warm():
+        reciter = resolve_reciter(get_user_reciter(user_id))
+        warm_ayah_audio(reciter, surah['number'], ayah['numberInSurah'] + 1, reciter_audio_url(reciter, ayah['number'] + 1))
+
+    prefetcher.schedule(user_id, f"ayah:{ayah['number'] + 1}", warm)
+
+
+def remember_query(chat_id, query):
+    last_queries[chat_id] = query
+    last_queries.move_to_end(chat_id)
+    while len(last_queries) > MAX_SEARCH_SESSIONS:
+        last_queries.popitem(last=False)
 
 def register(bot):
     @bot.message_handler(commands=['quran', 'قرآن'])
     def cmd_quran(msg):
         show_main_quran_menu(bot, msg.chat.id, msg.message_id if hasattr(msg, 'message_id') else None)
 
-    @bot.callback_query_handler(func=lambda call: call.data == "browse_quran")
+    @router.route("browse_quran")
     def ask_surah_number(call):
         bot.edit_message_text("📖 الرجاء إدخال رقم السورة (1-114):", call.message.chat.id, call.message.message_id)
         bot.register_next_step_handler(call.message, process_surah_number)
@@ -31,23 +91,53 @@ def register(bot):
         except:
             bot.send_message(msg.chat.id, "❌ يرجى إدخال رقم صحيح")
 
-    @bot.callback_query_handler(func=lambda call: call.data == "random_ayah")
-    def send_random_verse(call):
+    # 🎲 random_ayah | random_ayah:j:<جزء> | random_ayah:s:<من>:<إلى>
+    @router.route("random_ayah")
+    def send_random_verse(call, *args):
         try:
-            surah_num = random.randint(1, 114)
-            res = requests.get(f"{API_BASE}/surah/{surah_num}/ar.alafasy", headers=HEADERS, timeout=10)
-            verses = res.json()['data']['ayahs']
-            ayah = random.choice(verses)
-            send_verse_details(bot, call.message.chat.id, surah_num, ayah['numberInSurah'], call.message.message_id, edit=True)
+            ayah = pick_random_ayah(args)
+            if not ayah:
+                bot.answer_callback_query(call.id, "⚠️ نطاق غير صحيح")
+                return
+            send_verse_details(bot, call.message.chat.id, ayah['surah'], ayah['numberInSurah'], call.message.message_id, edit=True, again=call.data)
         except Exception as e:
             logger.error(f"[ERROR] Random Ayah: {e}")
             bot.edit_message_text("❌ تعذر جلب آية", call.message.chat.id, call.message.message_id)
 
+    # /random — أو /random جزء 30 — أو /random 2-5 (نطاق سور)
+    @bot.message_handler(commands=['random', 'عشوائية'])
+    def cmd_random(msg):
+        parts = msg.text.split(maxsplit=1)
+        args = parts[1] if len(parts) > 1 else ""
+        surah_range = re.search(r"(\d+)\s*-\s*(\d+)", args)
+        number = re.search(r"\d+", args)
+        if surah_range:
+            scope = ("s", surah_range.group(1), surah_range.group(2))
+        elif number and ("جزء" in args or "juz" in args.lower()):
+            scope = ("j", number.group())
+        elif number:
+            scope = ("s", number.group(), number.group())
+        else:
+            scope = ()
+        choice = callback_data("random_ayah", *scope)
+
+        ayah = pick_random_ayah(scope)
+        if not ayah:
+            bot.send_message(msg.chat.id, "⚠️ استخدم: /random أو /random جزء 30 أو /random 2-5")
+            return
+        send_verse_details(bot, msg.chat.id, ayah['surah'], ayah['numberInSurah'], again=choice)
+
+    def pick_random_ayah(args):
+        if len(args) == 2 and args[0] == "j":
+            return random_ayah(juz=int(args[1]))
+        if len(args) == 3 and args[0] == "s":
+            return random_ayah(surah_from=int(args[1]), surah_to=int(args[2]))
+        return random_ayah()
+
     def send_surah_info(chat_id, surah_num, message_id=None):
         try:
-            res = requests.get(f"{API_BASE}/surah/{surah_num}/ar.alafasy", headers=HEADERS)
-            data = res.json()['data']
-            ayah = data['ayahs'][0]
+            data = get_surah(surah_num)
+            ayah = get_ayah(surah_num, 1)
             text = f"📖 سورة {data['name']} ({data['englishName']})\nعدد الآيات: {data['numberOfAyahs']}\n\n"
             text += f"الآية 1:\n{ayah['text']}"
 
@@ -57,6 +147,7 @@ def register(bot):
                 InlineKeyboardButton("🎧 استماع", callback_data=f"listen_audio:{surah_num}:1"),
                 InlineKeyboardButton("⭐ حفظ", callback_data=f"fav:{surah_num}:{ayah['numberInSurah']}")
             )
+            markup.add(InlineKeyboardButton("📻 تشغيل السورة كاملة", callback_data=f"listen_surah:{surah_num}"))
             markup.add(InlineKeyboardButton("🏠 الرئيسية", callback_data="main_menu"))
 
             if message_id:
@@ -67,64 +158,170 @@ def register(bot):
             logger.error(f"[ERROR] Surah Info: {e}")
             bot.send_message(chat_id, "❌ حدث خطأ في عرض السورة")
 
-    def send_verse_details(bot, chat_id, surah_num, ayah_num, message_id=None, edit=False):
+    def send_verse_details(bot, chat_id, surah_num, ayah_num, message_id=None, edit=False, again="random_ayah"):
         try:
-            res = requests.get(f"{API_BASE}/surah/{surah_num}/ar.alafasy", headers=HEADERS)
-            verses = res.json()['data']['ayahs']
-            ayah = next((a for a in verses if a['numberInSurah'] == int(ayah_num)), None)
+            surah = get_surah(surah_num)
+            ayah = get_ayah(surah_num, ayah_num)
             if not ayah:
                 bot.send_message(chat_id, "❌ لم يتم العثور على الآية.")
                 return
 
-            text = f"📖 سورة {res.json()['data']['name']}\nالآية {ayah['numberInSurah']}:\n\n{ayah['text']}"
-
-            markup = InlineKeyboardMarkup()
-            markup.row(
-                InlineKeyboardButton("🔁 آية أخرى", callback_data="random_ayah"),
-                InlineKeyboardButton("🎧 استماع", callback_data=f"listen_audio:{surah_num}:{ayah['numberInSurah']}"),
-                InlineKeyboardButton("⭐ حفظ", callback_data=f"fav:{surah_num}:{ayah['numberInSurah']}")
-            )
-
-            nav = []
-            if ayah['numberInSurah'] > 1:
-                nav.append(InlineKeyboardButton("◀️ السابقة", callback_data=f"nav_{surah_num}_{ayah['numberInSurah'] - 1}"))
-            if ayah['numberInSurah'] < len(verses):
-                nav.append(InlineKeyboardButton("▶️ التالية", callback_data=f"nav_{surah_num}_{ayah['numberInSurah'] + 1}"))
-            if nav:
-                markup.row(*nav)
-
-            markup.add(InlineKeyboardButton("🏠 الرئيسية", callback_data="main_menu"))
-
+            text, markup = ayah_cards.get((ayah['number'], again), lambda: render_verse_card(surah, ayah, again))
             if edit and message_id:
                 bot.edit_message_text(text, chat_id, message_id, reply_markup=markup)
             else:
                 bot.send_message(chat_id, text, reply_markup=markup)
+            prefetch_next_ayah(chat_id, surah, ayah)
         except Exception as e:
             logger.error(f"[ERROR] Verse Details: {e}")
             bot.send_message(chat_id, "❌ حدث خطأ في عرض الآية")
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("listen_audio:"))
-    def play_audio(call):
+    # 🔍 البحث في القرآن: /search كلمات أو "عبارة متتالية"
+    @bot.message_handler(commands=['search', 'بحث'])
+    def cmd_search(msg):
+        parts = msg.text.split(maxsplit=1)
+        if len(parts) > 1 and parts[1].strip():
+            run_search(msg.chat.id, parts[1].strip())
+        else:
+            bot.send_message(msg.chat.id, "🔍 أرسل الكلمات التي تريد البحث عنها في القرآن:")
+            bot.register_next_step_handler(msg, process_search_query)
+
+    @router.route("quran_search")
+    def ask_search_query(call):
+        bot.edit_message_text(
+            "🔍 أرسل الكلمات التي تريد البحث عنها في القرآن:\n(ضع العبارة بين علامتي تنصيص \"...\" للبحث عنها متتالية)",
+            call.message.chat.id, call.message.message_id
+        )
+        bot.register_next_step_handler(call.message, process_search_query)
+
+    def process_search_query(msg):
+        if not msg.text or not msg.text.strip():
+            bot.send_message(msg.chat.id, "❌ يرجى إرسال نص للبحث")
+            return
+        run_search(msg.chat.id, msg.text.strip())
+
+    def run_search(chat_id, query):
+        remember_query(chat_id, query)
+        send_search_results(chat_id, query, 0)
+
+    def send_search_results(chat_id, query, page, message_id=None):
         try:
-            _, surah, ayah = call.data.split(":")
-            res = requests.get(f"{API_BASE}/surah/{surah}/ar.alafasy", headers=HEADERS)
-            verses = res.json()['data']['ayahs']
-            verse = next((v for v in verses if v['numberInSurah'] == int(ayah)), None)
-            if verse and verse.get("audio"):
-                bot.send_audio(call.message.chat.id, verse['audio'])
+            results, total = search_quran(query, page)
+        except Exception as e:
+            logger.error(f"[ERROR] Quran Search: {e}")
+            bot.send_message(chat_id, "❌ البحث غير متاح حاليًا، حاول لاحقًا")
+            return
+
+        markup = InlineKeyboardMarkup()
+        if not total:
+            text = f"🔍 لا توجد نتائج لـ: {query}"
+        else:
+            pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+            text = f"🔍 نتائج البحث عن: {query}\nعدد الآيات: {total} (صفحة {page + 1}/{pages})\n\n"
+            for item in results:
+                surah, ayah = item["surah"], item["ayah"]
+                verse = ayah["text"] if len(ayah["text"]) <= 200 else ayah["text"][:200] + "…"
+                text += f"📖 {surah['name']} ({ayah['numberInSurah']}):\n{verse}\n\n"
+                markup.add(InlineKeyboardButton(
+                    f"📖 {surah['name']} - آية {ayah['numberInSurah']}",
+                    callback_data=f"nav_{surah['number']}_{ayah['numberInSurah']}"
+                ))
+            nav = []
+            if page > 0:
+                nav.append(InlineKeyboardButton("◀️ السابق", callback_data=f"qsearch:{page - 1}"))
+            if page + 1 < pages:
+                nav.append(InlineKeyboardButton("▶️ التالي", callback_data=f"qsearch:{page + 1}"))
+            if nav:
+                markup.row(*nav)
+        markup.add(InlineKeyboardButton("🏠 الرئيسية", callback_data="main_menu"))
+
+        if message_id:
+            bot.edit_message_text(text, chat_id, message_id, reply_markup=markup)
+        else:
+            bot.send_message(chat_id, text, reply_markup=markup)
+
+    @router.route("qsearch")
+    def search_page(call, page):
+        query = last_queries.get(call.message.chat.id)
+        if not query:
+            bot.answer_callback_query(call.id, "⚠️ انتهت جلسة البحث، ابحث من جديد.")
+            return
+        bot.answer_callback_query(call.id)
+        send_search_results(call.message.chat.id, query, int(page), call.message.message_id)
+
+    @router.route("listen_audio")
+    def play_audio(call, surah, ayah):
+        try:
+            verse = get_ayah(surah, ayah)
+            if verse:
+                reciter = resolve_reciter(get_user_reciter(call.from_user.id))
+                send_ayah_audio(bot, call.message.chat.id, reciter, surah, ayah, reciter_audio_url(reciter, verse['number']))
             else:
                 bot.answer_callback_query(call.id, "❌ لا يوجد تلاوة صوتية")
         except Exception as e:
             logger.error(f"[ERROR] Audio: {e}")
             bot.answer_callback_query(call.id, "❌ خطأ في تشغيل الصوت")
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("fav:"))
-    def add_to_favorites(call):
+    # 📻 تشغيل السورة كاملة: ملفات الآيات بالترتيب عبر ذاكرة file_id وطابور الإرسال
+    @router.route("listen_surah")
+    def play_surah(call, surah_num):
+        chat_id = call.message.chat.id
+        surah = get_surah(surah_num)
+        if not surah:
+            bot.answer_callback_query(call.id, "❌ لم يتم العثور على السورة.")
+            return
+
+        stop = threading.Event()
+        with playlists_lock:
+            if chat_id in active_playlists:
+                bot.answer_callback_query(call.id, "⚠️ يوجد تشغيل جارٍ، أوقفه أولًا.")
+                return
+            active_playlists[chat_id] = stop
+
+        reciter = resolve_reciter(get_user_reciter(call.from_user.id))
+        bot.answer_callback_query(call.id)
+        markup = InlineKeyboardMarkup()
+        markup.add(InlineKeyboardButton("⏹️ إيقاف التشغيل", callback_data="stop_surah"))
+        bot.send_message(
+            chat_id,
+            f"📻 سورة {surah['name']} ({surah['numberOfAyahs']} آية)\n🎧 القارئ: {reciter_name(reciter)}",
+            reply_markup=markup
+        )
+
+        def run():
+            try:
+                for ayah_num in range(1, surah['numberOfAyahs'] + 1):
+                    if stop.is_set():
+                        break
+                    number = surah['firstAyah'] + ayah_num - 1
+                    result = queue_ayah_audio(
+                        chat_id, reciter, surah['number'], ayah_num, reciter_audio_url(reciter, number),
+                        title=f"{surah['name']} - {ayah_num}", performer=reciter_name(reciter)
+                    )
+                    if result is None:
+                        logger.error(f"[ERROR] Surah Playlist {surah['number']}:{ayah_num} -> {chat_id}")
+                        break
+            finally:
+                with playlists_lock:
+                    active_playlists.pop(chat_id, None)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @router.route("stop_surah")
+    def stop_surah(call):
+        with playlists_lock:
+            stop = active_playlists.get(call.message.chat.id)
+        if stop:
+            stop.set()
+            bot.answer_callback_query(call.id, "⏹️ تم إيقاف التشغيل.")
+        else:
+            bot.answer_callback_query(call.id, "ℹ️ لا يوجد تشغيل جارٍ.")
+
+    @router.route("fav")
+    def add_to_favorites(call, surah, ayah):
         try:
-            _, surah, ayah = call.data.split(":")
-            res = requests.get(f"{API_BASE}/surah/{surah}/ar.alafasy", headers=HEADERS)
-            data = res.json()['data']
-            verse = next((v for v in data['ayahs'] if v['numberInSurah'] == int(ayah)), None)
+            data = get_surah(surah)
+            verse = get_ayah(surah, ayah)
             if verse:
                 content = f"سورة {data['name']} - آية {ayah}:\n\n{verse['text']}"
                 add_to_fav(call.from_user.id, "ayah", content)
@@ -135,19 +332,14 @@ def register(bot):
             logger.error(f"[ERROR] Fav Ayah: {e}")
             bot.answer_callback_query(call.id, "❌ فشل الحفظ.")
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("nav_"))
-    def nav_verses(call):
+    @router.route("nav")
+    def nav_verses(call, surah, ayah):
         try:
-            _, surah, ayah = call.data.split("_")
             send_verse_details(bot, call.message.chat.id, surah, ayah, call.message.message_id, edit=True)
         except Exception as e:
             logger.error(f"[ERROR] Navigation: {e}")
             bot.answer_callback_query(call.id, "❌ فشل التنقل.")
 
-    @bot.callback_query_handler(func=lambda call: call.data == "main_menu")
-    def return_home(call):
-        show_main_menu(bot, call.message)
-
 # ✅ قائمة القرآن الرئيسية
 def show_main_quran_menu(bot, chat_id, message_id=None):
     markup = InlineKeyboardMarkup()
@@ -155,6 +347,10 @@ def show_main_quran_menu(bot, chat_id, message_id=None):
         InlineKeyboardButton("📖 تصفح السور", callback_data="browse_quran"),
         InlineKeyboardButton("🕋 آية عشوائية", callback_data="random_ayah")
     )
+    markup.row(
+        InlineKeyboardButton("🔍 البحث في القرآن", callback_data="quran_search"),
+        InlineKeyboardButton("🎲 آية من جزء عمّ", callback_data="random_ayah:j:30")
+    )
     markup.add(InlineKeyboardButton("🏠 العودة للرئيسية", callback_data="main_menu"))
 
     if message_id:
@@ -1,5 +1,7 @@
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-from utils.db import get_user_reminder_settings, update_reminder_setting
+from utils.db import get_user_reminder_settings, update_reminder_setting, get_user_reciter, set_user_reciter
+from utils.reciters import RECITERS, resolve_reciter, reciter_name
+from utils.router import router, callback_data
 
 # ✅ عرض إعدادات الإشعارات
 def show_settings_menu(bot, chat_id, message_id=None):
@@ -14,7 +16,8 @@ def show_settings_menu(bot, chat_id, message_id=None):
         InlineKeyboardButton(get_label("أذكار الصباح", "morning_adhkar", "🌅"), callback_data="settings:toggle:morning_adhkar"),
         InlineKeyboardButton(get_label("أذكار المساء", "evening_adhkar", "🌇"), callback_data="settings:toggle:evening_adhkar"),
         InlineKeyboardButton(get_label("تذكير الجمعة", "jumuah", "📿"), callback_data="settings:toggle:jumuah"),
-        InlineKeyboardButton(get_label("تذكيرات الصلاة", "prayer", "🕌"), callback_data="settings:toggle:prayer")
+        InlineKeyboardButton(get_label("تذكيرات الصلاة", "prayer", "🕌"), callback_data="settings:toggle:prayer"),
+        InlineKeyboardButton(f"🎧 القارئ: {reciter_name(get_user_reciter(chat_id))}", callback_data="settings:reciter")
     )
     markup.add(InlineKeyboardButton("🏠 الرجوع للقائمة الرئيسية", callback_data="back_to_main"))
 
@@ -24,23 +27,47 @@ def show_settings_menu(bot, chat_id, message_id=None):
     else:
         bot.send_message(chat_id, text, reply_markup=markup)
 
+# ✅ اختيار القارئ
+def show_reciter_menu(bot, chat_id, message_id):
+    current = resolve_reciter(get_user_reciter(chat_id))
+    markup = InlineKeyboardMarkup(row_width=1)
+    for reciter, info in RECITERS.items():
+        mark = "✅ " if reciter == current else ""
+        markup.add(InlineKeyboardButton(f"{mark}{info['name']}", callback_data=callback_data("settings:reciter", reciter)))
+    markup.add(InlineKeyboardButton("🔙 رجوع للإعدادات", callback_data="settings:menu"))
+    bot.edit_message_text("🎧 اختر القارئ لتلاوة الآيات والسور:", chat_id, message_id, reply_markup=markup)
+
 # ✅ تسجيل الأوامر والمعالجات الخاصة بالإعدادات
 def register(bot):
     @bot.message_handler(commands=['settings'])
     def show_settings_menu_command(msg):
         show_settings_menu(bot, msg.chat.id)
 
-    @bot.callback_query_handler(func=lambda call: call.data.startswith("settings:toggle:"))
-    def toggle_setting(call):
-        _, _, setting_key = call.data.split(":")
+    @router.route("settings:toggle")
+    def toggle_setting(call, setting_key):
         current_settings = get_user_reminder_settings(call.from_user.id)
         current_value = current_settings.get(setting_key, True)
         update_reminder_setting(call.from_user.id, setting_key, not current_value)
         bot.answer_callback_query(call.id, f"{'✅ تم التفعيل' if not current_value else '❌ تم الإلغاء'}")
         show_settings_menu(bot, call.from_user.id, call.message.message_id)
 
-    # ✅ زر الرجوع للقائمة الرئيسية
-    @bot.callback_query_handler(func=lambda call: call.data == "back_to_main")
-    def back_to_main(call):
-        from main import show_main_menu
-        show_main_menu(bot, call.message)
+    # settings:reciter يعرض القائمة، و settings:reciter:<قارئ> يحفظ الاختيار
+    @router.route("settings:reciter")
+    def choose_reciter(call, *args):
+        if not args:
+            bot.answer_callback_query(call.id)
+            show_reciter_menu(bot, call.message.chat.id, call.message.message_id)
+            return
+
+        reciter = ":".join(args)
+        if reciter not in RECITERS:
+            bot.answer_callback_query(call.id, "❌ قارئ غير معروف")
+            return
+        set_user_reciter(call.from_user.id, reciter)
+        bot.answer_callback_query(call.id, f"✅ تم اختيار {RECITERS[reciter]['name']}")
+        show_reciter_menu(bot, call.message.chat.id, call.message.message_id)
+
+    @router.route("settings:menu")
+    def back_to_settings(call):
+        bot.answer_callback_query(call.id)
+        show_settings_menu(bot, call.message.chat.id, call.message.message_id)
@@ -2,70 +2,54 @@ import telebot
 from config import BOT_TOKEN
 from handlers import prayers, quran, athkar, favorites, complaints, admin, hadith, settings
 from tasks import reminders
+from utils.sender import sender
+from tasks.broadcasts import start_broadcast_worker
+from tasks.build_quran_corpus import ensure_corpus
+from utils.quran_search import warm_quran_index
+from utils.hadith_search import warm_hadith_index
+from utils.athkar_data import warm_athkar
 from utils.db import is_admin, add_admin, register_user  # ✅ ضروري
 from config import OWNER_ID
 
 import threading
 from flask import Flask
-from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from utils.menu import MAIN_MENU_TEXT, main_menu_markup, show_main_menu
+from utils.router import router
 
 bot = telebot.TeleBot(BOT_TOKEN)
 
+# ✅ طابور الإرسال المشترك (حدود تيليجرام)
+sender.start(bot)
+
+# ✅ استئناف الرسائل الجماعية غير المكتملة
+start_broadcast_worker(bot)
+
+# ✅ تجهيز ملف القرآن المحلي (مرة واحدة فقط إذا لم يكن موجودًا)
+ensure_corpus()
+warm_quran_index()
+
+# ✅ فهرسة الأحاديث المحفوظة محليًا للبحث
+warm_hadith_index()
+
+# ✅ تحميل الأذكار من القرص وتحديثها في الخلفية (مشتركة بين القوائم والتذكيرات)
+warm_athkar()
+
 # ✅ بدء التذكيرات
 reminders.start_reminders(bot)
 
-# ✅ عرض القائمة الرئيسية
-def show_main_menu(bot, message):
-    markup = InlineKeyboardMarkup(row_width=2)
-    markup.add(
-        InlineKeyboardButton("🕌 أوقات الصلاة", callback_data="menu:prayer"),
-        InlineKeyboardButton("📖 القرآن الكريم", callback_data="menu:quran"),
-        InlineKeyboardButton("📿 الأذكار", callback_data="menu:athkar"),
-        InlineKeyboardButton("📜 الحديث", callback_data="menu:hadith"),
-        InlineKeyboardButton("⭐ المفضلة", callback_data="menu:fav"),
-        InlineKeyboardButton("📝 الشكاوى", callback_data="menu:complain"),
-        InlineKeyboardButton("⚙️ الإعدادات", callback_data="menu:settings")
-    )
-    if is_admin(message.chat.id):
-        markup.add(InlineKeyboardButton("🧑‍💼 المشرف", callback_data="menu:admin"))
-
-    bot.edit_message_text(
-        "🌙 مرحبًا بك في البوت الإسلامي!\nاختر أحد الخيارات:",
-        message.chat.id,
-        message.message_id,
-        reply_markup=markup
-    )
-
 # ✅ أمر /start
 @bot.message_handler(commands=['start'])
 def welcome(msg):
     print(f"✅ تم استقبال أمر /start من: {msg.from_user.id}")
     register_user(msg.from_user)
 
-    markup = InlineKeyboardMarkup(row_width=2)
-    markup.add(
-        InlineKeyboardButton("🕌 أوقات الصلاة", callback_data="menu:prayer"),
-        InlineKeyboardButton("📖 القرآن الكريم", callback_data="menu:quran"),
-        InlineKeyboardButton("📿 الأذكار", callback_data="menu:athkar"),
-        InlineKeyboardButton("📜 الحديث", callback_data="menu:hadith"),
-        InlineKeyboardButton("⭐ المفضلة", callback_data="menu:fav"),
-        InlineKeyboardButton("📝 الشكاوى", callback_data="menu:complain"),
-        InlineKeyboardButton("⚙️ الإعدادات", callback_data="menu:settings")
-    )
-    if is_admin(msg.from_user.id):
-        markup.add(InlineKeyboardButton("🧑‍💼 المشرف", callback_data="menu:admin"))
-
-    bot.send_message(
-        msg.chat.id,
-        "🌙 مرحبًا بك في البوت الإسلامي!\nاختر أحد الخيارات:",
-        reply_markup=markup
-    )
+    bot.send_message(msg.chat.id, MAIN_MENU_TEXT, reply_markup=main_menu_markup(msg.from_user.id))
 
 # ✅ التعامل مع القائمة الرئيسية
-@bot.callback_query_handler(func=lambda call: call.data.startswith("menu:") or call.data == "back_to_main")
-def handle_main_menu(call):
+# main_menu و back_to_main مسجلان هنا فقط (كانا مكررين في عدة ملفات)
+@router.route("menu", "main_menu", "back_to_main")
+def handle_main_menu(call, action="main"):
     bot.answer_callback_query(call.id)
-    action = call.data.split(":")[1] if ":" in call.data else "main"
 
     if action == "prayer":
         from handlers.prayers import show_prayer_times
@@ -102,7 +86,7 @@ def handle_main_menu(call):
         from handlers.settings import show_settings_menu
         show_settings_menu(bot, call.message.chat.id, call.message.message_id)
 
-    elif action == "main" or call.data == "back_to_main":
+    elif action == "main":
         show_main_menu(bot, call.message)
 
 # ✅ تسجيل باقي الأوامر
@@ -117,6 +101,9 @@ admin.register(bot)
 hadith.register(bot)
 settings.register(bot)
 
+# ✅ معالج واحد لكل الأزرار يوجّه حسب بادئة callback_data
+router.install(bot)
+
 # ✅ تشغيل البوت و Flask
 def run_bot():
     bot.infinity_polling()
@@ -0,0 +1,33 @@
+import sys
+from pymongo import UpdateOne
+from utils.db import user_col
+from utils.timezones import timezone_at
+
+# 🛠️ تصحيح المستخدمين المحفوظين بتوقيت "auto" (يُشغّل مرة واحدة)
+# الاستخدام: python -m tasks.backfill_timezones [--all]
+# --all يعيد حساب المنطقة لكل من لديه موقع (بعد تحسين تحديد المناطق قرب الحدود)
+def backfill_timezones(batch_size=500, recompute_all=False):
+    query = {"location.lat": {"$ne": None}, "location.lon": {"$ne": None}}
+    if not recompute_all:
+        query["timezone"] = {"$in": ["auto", None]}
+    ops = []
+    fixed = 0
+    for doc in user_col.find(query, {"location": 1}, batch_size=batch_size):
+        location = doc.get("location") or {}
+        try:
+            tz_name = timezone_at(location["lat"], location["lon"])
+        except Exception as e:
+            print(f"[ERROR] تحديد التوقيت للمستخدم {doc['_id']}: {e}")
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timezone": tz_name}}))
+        if len(ops) >= batch_size:
+            fixed += user_col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        fixed += user_col.bulk_write(ops, ordered=False).modified_count
+    return fixed
+
+
+if __name__ == "__main__":
+    count = backfill_timezones(recompute_all="--all" in sys.argv[1:])
+    print(f"✅ تم تصحيح المنطقة الزمنية لـ {count} مستخدم.")
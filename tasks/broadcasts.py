@@ -0,0 +1,205 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from telebot.apihelper import ApiTelegramException
+from utils.db import db, user_col
+from utils.sender import send, PRIORITY_BROADCAST
+from utils.sharding import REPLICA_ID
+
+jobs_col = db["broadcast_jobs"]
+
+BATCH_SIZE = 200
+LEASE_SECONDS = 120
+PROGRESS_SECONDS = 5
+RESUME_CHECK_SECONDS = 60
+# تجديد العقد بمؤقت مستقل لأن الدفعة قد تنتظر الطابور أكثر من مدة العقد
+RENEW_SECONDS = LEASE_SECONDS // 4
+
+# المهام التي يشغلها هذا الـ process حاليًا (حتى لا يبدأ لها عامل ثانٍ)
+_running = set()
+_running_lock = threading.Lock()
+
+
+# ✅ إرسال محتوى الرسالة الجماعية لمستخدم واحد عبر طابور الإرسال
+def send_broadcast_content(user_id, content, on_done=None):
+    if content['type'] == 'text':
+        return send("send_message", user_id, content['text'], priority=PRIORITY_BROADCAST, on_done=on_done)
+    if content['type'] == 'sticker':
+        return send("send_sticker", user_id, content['file_id'], priority=PRIORITY_BROADCAST, on_done=on_done)
+    method = {
+        'photo': "send_photo",
+        'video': "send_video",
+        'voice': "send_voice",
+        'document': "send_document"
+    }[content['type']]
+    return send(method, user_id, content['file_id'], caption=content['caption'], priority=PRIORITY_BROADCAST, on_done=on_done)
+
+
+def _is_blocked_error(error):
+    return isinstance(error, ApiTelegramException) and error.error_code == 403
+
+
+def progress_text(job):
+    done = job["sent"] + job["failed"] + job["blocked"]
+    status = "✅ اكتمل الإرسال" if job["status"] == "done" else "🚀 جاري الإرسال..."
+    return (
+        f"📢 الرسالة الجماعية: {status}\n\n"
+        f"📊 التقدم: {done}/{job['total']}\n"
+        f"✅ تم الإرسال: {job['sent']}\n"
+        f"❌ فشل: {job['failed']}\n"
+        f"🚫 حظروا البوت: {job['blocked']}"
+    )
+
+
+def _update_progress(bot, job):
+    try:
+        bot.edit_message_text(progress_text(job), job["admin_chat_id"], job["progress_message_id"])
+    except Exception as e:
+        # تيليجرام يرفض التعديل إذا لم يتغير النص
+        if "message is not modified" not in str(e):
+            print(f"[ERROR] تحديث تقدم الرسالة الجماعية {job['_id']}: {e}")
+
+
+# 📝 حفظ مهمة جديدة في القاعدة قبل بدء الإرسال
+def create_broadcast_job(bot, admin_chat_id, content):
+    total = user_col.count_documents({"blocked": {"$ne": True}})
+    progress = bot.send_message(admin_chat_id, "🚀 جاري تجهيز الرسالة الجماعية...")
+    job = {
+        "content": content,
+        "admin_chat_id": admin_chat_id,
+        "progress_message_id": progress.message_id,
+        "status": "running",
+        "cursor": None,
+        "total": total,
+        "sent": 0,
+        "failed": 0,
+        "blocked": 0,
+        "created_at": datetime.utcnow(),
+        "lease_owner": None,
+        "lease_until": datetime.utcnow()
+    }
+    job["_id"] = jobs_col.insert_one(job).inserted_id
+    return job
+
+
+# 🔒 نسخة واحدة فقط تعمل على المهمة، وتنتقل لغيرها إذا انتهى العقد
+def _claim(job_id):
+    now = datetime.utcnow()
+    return jobs_col.find_one_and_update(
+        {"_id": job_id, "status": "running", "lease_until": {"$lte": now}},
+        {"$set": {"lease_owner": REPLICA_ID, "lease_until": now + timedelta(seconds=LEASE_SECONDS)}},
+        return_document=True
+    )
+
+
+def _send_batch(job, user_ids):
+    jobs = [send_broadcast_content(user_id, job["content"]) for user_id in user_ids]
+    sent, failed, blocked = 0, 0, []
+    for user_id, send_job in zip(user_ids, jobs):
+        if send_job.wait():
+            sent += 1
+        elif _is_blocked_error(send_job.error):
+            blocked.append(user_id)
+        else:
+            failed += 1
+    if blocked:
+        user_col.update_many({"_id": {"$in": blocked}}, {"$set": {"blocked": True}})
+    return sent, failed, len(blocked)
+
+
+# ⏱️ تجديد العقد دوريًا طوال تشغيل المهمة؛ يتوقف عند فقدان العقد
+def _keep_lease(job_id, stop, lost):
+    while not stop.wait(RENEW_SECONDS):
+        try:
+            renewed = jobs_col.update_one(
+                {"_id": job_id, "status": "running", "lease_owner": REPLICA_ID},
+                {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)}}
+            )
+            if not renewed.matched_count:
+                lost.set()
+                return
+        except Exception as e:
+            print(f"[ERROR] تجديد عقد الرسالة الجماعية {job_id}: {e}")
+
+
+# ✅ تنفيذ المهمة من آخر نقطة محفوظة (cursor) حتى النهاية
+def run_broadcast_job(bot, job_id):
+    job = _claim(job_id)
+    if not job:
+        return
+
+    stop, lost = threading.Event(), threading.Event()
+    threading.Thread(target=_keep_lease, args=(job_id, stop, lost), daemon=True).start()
+    try:
+        _run_claimed(bot, job_id, job, lost)
+    finally:
+        stop.set()
+
+
+def _run_claimed(bot, job_id, job, lost):
+    last_progress = 0
+    while not lost.is_set():
+        query = {"blocked": {"$ne": True}}
+        if job["cursor"] is not None:
+            query["_id"] = {"$gt": job["cursor"]}
+        user_ids = [doc["_id"] for doc in user_col.find(query, {"_id": 1}).sort("_id", 1).limit(BATCH_SIZE)]
+
+        if not user_ids:
+            job = jobs_col.find_one_and_update(
+                {"_id": job_id, "lease_owner": REPLICA_ID},
+                {"$set": {"status": "done", "finished_at": datetime.utcnow()}},
+                return_document=True
+            )
+            if job:
+                _update_progress(bot, job)
+            return
+
+        sent, failed, blocked = _send_batch(job, user_ids)
+        job = jobs_col.find_one_and_update(
+            {"_id": job_id, "lease_owner": REPLICA_ID},
+            {
+                "$set": {"cursor": user_ids[-1], "lease_until": datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)},
+                "$inc": {"sent": sent, "failed": failed, "blocked": blocked}
+            },
+            return_document=True
+        )
+        if not job:
+            # فقدنا العقد لنسخة أخرى
+            return
+
+        if time.monotonic() - last_progress >= PROGRESS_SECONDS:
+            _update_progress(bot, job)
+            last_progress = time.monotonic()
+
+
+def start_broadcast_job(bot, job_id):
+    with _running_lock:
+        if job_id in _running:
+            return
+        _running.add(job_id)
+
+    def target():
+        try:
+            run_broadcast_job(bot, job_id)
+        except Exception as e:
+            print(f"[ERROR] الرسالة الجماعية {job_id}: {e}")
+        finally:
+            with _running_lock:
+                _running.discard(job_id)
+
+    threading.Thread(target=target, daemon=True).start()
+
+
+# 🔄 استئناف المهام المتوقفة (بعد إعادة تشغيل أو توقف نسخة)
+def start_broadcast_worker(bot):
+    def loop():
+        while True:
+            try:
+                now = datetime.utcnow()
+                for job in jobs_col.find({"status": "running", "lease_until": {"$lte": now}}, {"_id": 1}):
+                    start_broadcast_job(bot, job["_id"])
+            except Exception as e:
+                print(f"[ERROR] استئناف الرسائل الجماعية: {e}")
+            time.sleep(RESUME_CHECK_SECONDS)
+
+    threading.Thread(target=loop, daemon=True).start()
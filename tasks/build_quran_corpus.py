@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import threading
+import requests
+from utils.quran_corpus import CORPUS_PATH, TOTAL_AYAHS, corpus_exists, reload
+
+API_BASE = "https://api.alquran.cloud/v1"
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+EDITION = "quran-uthmani"
+
+
+# 🛠️ بناء ملف القرآن المحلي من alquran.cloud (استدعاء واحد للمصحف كاملًا)
+# الاستخدام: python -m tasks.build_quran_corpus
+def build_corpus(path=CORPUS_PATH):
+    res = requests.get(f"{API_BASE}/quran/{EDITION}", headers=HEADERS, timeout=120)
+    res.raise_for_status()
+    surahs = res.json()["data"]["surahs"]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript("""
+            CREATE TABLE surahs (
+                number INTEGER PRIMARY KEY,
+                name TEXT,
+                english_name TEXT,
+                english_translation TEXT,
+                revelation_type TEXT,
+                ayah_count INTEGER,
+                first_ayah INTEGER
+            );
+            CREATE TABLE ayahs (
+                number INTEGER PRIMARY KEY,
+                surah INTEGER,
+                ayah INTEGER,
+                text TEXT,
+                juz INTEGER,
+                page INTEGER,
+                UNIQUE (surah, ayah)
+            );
+        """)
+        total = 0
+        for surah in surahs:
+            ayahs = surah["ayahs"]
+            conn.execute(
+                "INSERT INTO surahs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (surah["number"], surah["name"], surah["englishName"], surah.get("englishNameTranslation"),
+                 surah.get("revelationType"), len(ayahs), ayahs[0]["number"])
+            )
+            conn.executemany(
+                "INSERT INTO ayahs VALUES (?, ?, ?, ?, ?, ?)",
+                [(a["number"], surah["number"], a["numberInSurah"], a["text"], a.get("juz"), a.get("page")) for a in ayahs]
+            )
+            total += len(ayahs)
+        if total != TOTAL_AYAHS:
+            raise ValueError(f"عدد الآيات غير صحيح: {total}")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp, path)
+    return total
+
+
+# ✅ عند التشغيل: بناء الملف في الخلفية إذا لم يكن موجودًا
+def ensure_corpus():
+    if corpus_exists():
+        return
+
+    def run():
+        try:
+            count = build_corpus()
+            reload()
+            print(f"✅ تم بناء ملف القرآن المحلي ({count} آية).")
+        except Exception as e:
+            print(f"[ERROR] بناء ملف القرآن المحلي: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+if __name__ == "__main__":
+    count = build_corpus()
+    print(f"✅ تم بناء ملف القرآن المحلي ({count} آية) في {CORPUS_PATH}")
@@ -0,0 +1,51 @@
+import sys
+import telebot
+from config import BOT_TOKEN, AUDIO_CACHE_CHANNEL_ID
+from utils.audio_cache import audio_cache, file_id_of
+from utils.quran_corpus import ayah_count, get_ayah_by_number
+from utils.reciters import DEFAULT_RECITER, resolve_reciter, reciter_audio_url
+from utils.sender import sender, send, PRIORITY_BROADCAST
+
+BATCH_SIZE = 50
+
+
+# 🔥 رفع تلاوة المصحف كاملًا لقارئ واحد إلى قناة خاصة لتعبئة ذاكرة file_id
+# يتخطى الآيات المحفوظة مسبقًا، لذا يمكن إيقافه وإعادة تشغيله في أي وقت
+# الاستخدام: python -m tasks.prewarm_audio ar.alafasy
+def prewarm_audio(reciter=DEFAULT_RECITER, channel_id=AUDIO_CACHE_CHANNEL_ID):
+    if not channel_id:
+        raise ValueError("AUDIO_CACHE_CHANNEL_ID غير مضبوط")
+    reciter = resolve_reciter(reciter)
+
+    cached = audio_cache.cached_keys(reciter)
+    pending = []
+    for number in range(1, ayah_count() + 1):
+        ayah = get_ayah_by_number(number)
+        if audio_cache.key(reciter, ayah["surah"], ayah["numberInSurah"]) not in cached:
+            pending.append(ayah)
+
+    uploaded, failed = 0, 0
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = pending[start:start + BATCH_SIZE]
+        # الطابور المشترك يحترم حد القنوات (20 رسالة/دقيقة)
+        jobs = [
+            send("send_audio", channel_id, reciter_audio_url(reciter, ayah["number"]),
+                 caption=f"{reciter} {ayah['surah']}:{ayah['numberInSurah']}", priority=PRIORITY_BROADCAST)
+            for ayah in batch
+        ]
+        for ayah, job in zip(batch, jobs):
+            file_id = file_id_of(job.result) if job.wait() else None
+            if file_id:
+                audio_cache.set(reciter, ayah["surah"], ayah["numberInSurah"], file_id)
+                uploaded += 1
+            else:
+                failed += 1
+        print(f"🔥 {reciter}: {start + len(batch)}/{len(pending)} (✅ {uploaded} ❌ {failed})")
+    return uploaded, failed
+
+
+if __name__ == "__main__":
+    bot = telebot.TeleBot(BOT_TOKEN)
+    sender.start(bot)
+    uploaded, failed = prewarm_audio(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_RECITER)
+    print(f"✅ انتهى التسخين: {uploaded} ملف، فشل {failed}")
@@ -1,142 +1,124 @@
 import threading
 import time
-import requests
 from datetime import datetime, timedelta
-from pytz import timezone as tz, utc
 from utils.db import (
-    get_all_user_ids,
-    get_user_location,
-    get_user_timezone,
-    get_user_reminder_settings
+    iter_reminder_users,
+    get_reminder_user,
+    on_user_changed,
+    ensure_reminder_indexes,
+    get_user_timezones,
+    iter_jumuah_user_ids,
+    iter_reminder_users_changed_since
 )
-
-API_PRAYER = "http://api.aladhan.com/v1/timings"
-ATHKAR_API = "https://ahegazy.github.io/muslimKit/json/"
-
-last_sent_prayer = {}
-last_sent_adhkar = {}
-
-# ✅ إرسال أذكار الصباح أو المساء
+from utils.dedup import reminder_claims
+from utils.sharding import membership, HEARTBEAT_SECONDS
+from utils.sender import send, PRIORITY_REMINDER
+from utils.athkar_data import get_adhkar_message
+from tasks.scheduler import ReminderScheduler
+
+PRAYER_NAMES = {
+    "Fajr": "الفجر",
+    "Dhuhr": "الظهر",
+    "Asr": "العصر",
+    "Maghrib": "المغرب",
+    "Isha": "العشاء"
+}
+
+# ✅ إرسال أذكار الصباح أو المساء (الرسالة مبنية مسبقًا من النسخة المحفوظة)
 def send_adhkar(bot, user_id, time_of_day):
     try:
-        endpoint = "azkar_sabah.json" if time_of_day == "morning" else "azkar_massa.json"
-        response = requests.get(f"{ATHKAR_API}{endpoint}", timeout=10)
-        data = response.json()
-        azkar = data.get("content", [])[:10]
-
-        message = f"📿 أذكار {'الصباح' if time_of_day == 'morning' else 'المساء'}:\n" + "-"*50 + "\n"
-        for i, item in enumerate(azkar, 1):
-            text = item.get("zekr", "").strip()
-            repeat = item.get("repeat", "غير مذكور")
-            message += f"{i}. 📖 {text}\n🔁 التكرار: {repeat}\n\n"
-
-        bot.send_message(user_id, message)
+        send("send_message", user_id, get_adhkar_message(time_of_day), priority=PRIORITY_REMINDER)
     except Exception as e:
         print(f"[ERROR] إرسال أذكار {time_of_day} للمستخدم {user_id}: {e}")
 
 # ✅ تذكير الجمعة
 def send_jumuah_reminder(bot, user_id):
     try:
-        bot.send_message(user_id,
+        send("send_message", user_id,
             "🌙 جمعة مباركة!\n\n"
             "📖 لا تنسَ قراءة *سورة الكهف* اليوم.\n"
             "💌 وأكثر من الصلاة على النبي ﷺ.\n\n"
-            "اللهم صلِّ وسلم على نبينا محمد"
+            "اللهم صلِّ وسلم على نبينا محمد",
+            priority=PRIORITY_REMINDER
         )
     except Exception as e:
         print(f"[ERROR] تذكير الجمعة للمستخدم {user_id}: {e}")
 
-# ✅ منع التكرار لتذكير الصلاة
-def should_send(user_id, prayer_key):
-    now = datetime.utcnow()
-    key = (user_id, prayer_key)
-    last = last_sent_prayer.get(key)
-    if not last or (now - last) > timedelta(minutes=10):
-        last_sent_prayer[key] = now
-        return True
-    return False
-
-# ✅ منع التكرار لتذكير الأذكار بعد الصلاة
-def should_send_adhkar(user_id, label):
-    now = datetime.utcnow()
-    key = (user_id, label)
-    last = last_sent_adhkar.get(key)
-    if not last or (now - last) > timedelta(minutes=60):
-        last_sent_adhkar[key] = now
-        return True
-    return False
-
-# ✅ تذكير الصلاة + أذكار بعد الفجر والعشاء
-def send_prayer_reminders(bot):
-    now_utc = datetime.utcnow()
-    for user_id in get_all_user_ids():
-        lat, lon = get_user_location(user_id)
-        tz_name = get_user_timezone(user_id)
-        settings = get_user_reminder_settings(user_id)
-
-        if not lat or not lon or not settings.get("prayer", True):
-            continue
-
-        try:
-            user_tz = tz(tz_name) if tz_name and tz_name != "auto" else utc
-            now_user = now_utc.replace(tzinfo=utc).astimezone(user_tz)
-
-            response = requests.get(f"{API_PRAYER}?latitude={lat}&longitude={lon}&method=4", timeout=10)
-            timings = response.json()["data"]["timings"]
-
-            prayers = {
-                "Fajr": "الفجر",
-                "Dhuhr": "الظهر",
-                "Asr": "العصر",
-                "Maghrib": "المغرب",
-                "Isha": "العشاء"
-            }
-
-            for key, name in prayers.items():
-                prayer_time = datetime.strptime(timings[key], "%H:%M").replace(
-                    year=now_user.year, month=now_user.month, day=now_user.day
-                )
-                prayer_time = user_tz.localize(prayer_time, is_dst=None)
-
-                # ⏰ التذكير قبل الصلاة بـ10 دقائق (مرونة ±6 دقائق)
-                remind_time = prayer_time - timedelta(minutes=10)
-                minutes_to_reminder = (remind_time - now_user).total_seconds() / 60
-                if -2 <= minutes_to_reminder <= 6 and should_send(user_id, key):
-                    bot.send_message(
-                        user_id,
-                        f"🕌 {name}\n"
-                        "لم يتبقَّ الكثير على الأذان والصلاة ⏳ فلا تنساها ولا تتغافل عنها ✨\n"
-                        "اللهم اجعلنا من المحافظين عليها 🤲"
-                    )
-
-                # 🕯️ أذكار بعد الفجر أو العشاء بين 28–32 دقيقة
-                if key in ["Fajr", "Isha"]:
-                    target = "morning" if key == "Fajr" else "evening"
-                    delta = (now_user - prayer_time).total_seconds() / 60
-                    if 28 <= delta <= 32 and should_send_adhkar(user_id, f"{key}_athkar"):
-                        send_adhkar(bot, user_id, target)
-
-        except Exception as e:
-            print(f"[ERROR] تذكير الصلاة للمستخدم {user_id}: {e}")
-
-# ✅ الحلقات
+# ✅ تذكير الصلاة قبل الأذان
+def send_prayer_reminder(bot, user_id, prayer_key):
+    name = PRAYER_NAMES.get(prayer_key, prayer_key)
+    send(
+        "send_message",
+        user_id,
+        f"🕌 {name}\n"
+        "لم يتبقَّ الكثير على الأذان والصلاة ⏳ فلا تنساها ولا تتغافل عنها ✨\n"
+        "اللهم اجعلنا من المحافظين عليها 🤲",
+        priority=PRIORITY_REMINDER
+    )
+
+# ✅ تنفيذ الحدث المستحق من المجدول (مفتاح لكل موعد حتى لا يُرسل مرتين)
+def dispatch_reminder(bot, user_id, kind, label, fire_at):
+    if kind == "jumuah_zone":
+        # المنطقة وصلت الجمعة 9:00، كل نسخة ترسل لمستخدميها فقط
+        for uid in iter_jumuah_user_ids(label):
+            if membership.owns(uid) and reminder_claims.claim(f"jumuah:{uid}:{fire_at:%Y%m%d}"):
+                send_jumuah_reminder(bot, uid)
+        return
+
+    if not membership.owns(user_id):
+        return
+    key = f"{kind}:{user_id}:{label}:{fire_at:%Y%m%d%H%M}"
+    if not reminder_claims.claim(key):
+        return
+
+    if kind == "prayer":
+        send_prayer_reminder(bot, user_id, label)
+    elif kind == "adhkar":
+        send_adhkar(bot, user_id, label)
+    elif kind == "jumuah":
+        send_jumuah_reminder(bot, user_id)
+
+# ✅ تشغيل المجدول: تحميل مستخدمي هذه النسخة مرة واحدة ثم النوم حتى أقرب موعد
 def start_reminders(bot):
-    def jumuah_loop():
-        while True:
-            now_utc = datetime.utcnow()
-            for uid in get_all_user_ids():
-                tz_name = get_user_timezone(uid)
-                user_tz = tz(tz_name) if tz_name and tz_name != "auto" else utc
-                now_local = now_utc.replace(tzinfo=utc).astimezone(user_tz)
-                settings = get_user_reminder_settings(uid)
-                if now_local.weekday() == 4 and now_local.hour == 9 and now_local.minute == 0 and settings.get("jumuah", True):
-                    send_jumuah_reminder(bot, uid)
-            time.sleep(60)
-
-    def prayer_loop():
+    scheduler = ReminderScheduler(
+        dispatch=lambda user_id, kind, label, fire_at: dispatch_reminder(bot, user_id, kind, label, fire_at),
+        load_user=get_reminder_user,
+        owns=membership.owns
+    )
+    on_user_changed(scheduler.update_user)
+
+    # مؤشر واحد بدفعات بدل ثلاث استعلامات لكل مستخدم
+    def load_all():
+        for user in iter_reminder_users():
+            try:
+                scheduler.update_user(user["_id"], user)
+            except Exception as e:
+                print(f"[ERROR] جدولة تذكيرات المستخدم {user['_id']}: {e}")
+
+    # 🔄 التقاط التعديلات التي تمت في نسخ أخرى
+    def sync_changes():
+        since = datetime.utcnow() - timedelta(seconds=HEARTBEAT_SECONDS)
         while True:
-            send_prayer_reminders(bot)
-            time.sleep(30)
-
-    threading.Thread(target=jumuah_loop, daemon=True).start()
-    threading.Thread(target=prayer_loop, daemon=True).start()
+            time.sleep(HEARTBEAT_SECONDS)
+            checked_at = datetime.utcnow()
+            try:
+                for user in iter_reminder_users_changed_since(since):
+                    scheduler.update_user(user["_id"], user)
+                since = checked_at - timedelta(seconds=HEARTBEAT_SECONDS)
+            except Exception as e:
+                print(f"[ERROR] مزامنة تعديلات التذكير: {e}")
+
+    def start():
+        ensure_reminder_indexes()
+        reminder_claims.ensure_indexes()
+        membership.start()
+        # عند دخول أو خروج نسخة يُعاد توزيع المستخدمين
+        membership.on_change(lambda members: threading.Thread(target=load_all, daemon=True).start())
+        for tz_name in get_user_timezones():
+            scheduler.add_zone(tz_name)
+        load_all()
+        sync_changes()
+
+    threading.Thread(target=start, daemon=True).start()
+    threading.Thread(target=scheduler.run, daemon=True).start()
+    return scheduler
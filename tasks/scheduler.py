@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from pytz import utc
+from config import PRAYER_METHOD
+from utils.prayer_times import resolve_timezone, localize
+from utils.timetable_cache import get_timings_cached
+
+PRAYER_KEYS = ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"]
+
+# التذكير قبل الأذان بـ10 دقائق، والأذكار بعد الفجر/العشاء بـ30 دقيقة
+PRAYER_LEAD = timedelta(minutes=10)
+ADHKAR_DELAY = timedelta(minutes=30)
+ADHKAR_PRAYERS = {"Fajr": "morning", "Isha": "evening"}
+ADHKAR_SETTINGS = {"morning": "morning_adhkar", "evening": "evening_adhkar"}
+
+# الجمعة الساعة 9:00 صباحًا بالتوقيت المحلي
+JUMUAH_WEEKDAY = 4
+JUMUAH_HOUR = 9
+
+# أقصى مدة نوم حتى لو كانت الكومة فارغة (لالتقاط التعديلات المتأخرة)
+MAX_SLEEP = 300
+
+# عند فشل حساب الموعد التالي (بيانات تالفة أو خطأ في الحساب) نعيد المحاولة بتأخير متزايد
+RETRY_BASE = timedelta(minutes=5)
+RETRY_MAX = timedelta(hours=6)
+RETRY = "__retry__"
+
+
+def _prayer_datetime(user_tz, day, hhmm):
+    hour, minute = map(int, hhmm.split(":"))
+    return localize(user_tz, datetime(day.year, day.month, day.day, hour, minute)).astimezone(utc)
+
+
+# 🕌 موعد تذكير الصلاة التالي بعد اللحظة المعطاة
+def next_prayer_event(user, after):
+    user_tz = resolve_timezone(user["timezone"], user["lon"])
+    local_day = after.astimezone(user_tz).date()
+    for offset in range(3):
+        day = local_day + timedelta(days=offset)
+        timings = get_timings_cached(user["lat"], user["lon"], day, user["timezone"], PRAYER_METHOD)
+        for key in PRAYER_KEYS:
+            if timings[key] == "--:--":
+                continue
+            fire_at = _prayer_datetime(user_tz, day, timings[key]) - PRAYER_LEAD
+            if fire_at > after:
+                return fire_at, key
+    return None
+
+
+# 📿 موعد أذكار ما بعد الفجر أو العشاء التالي
+def next_adhkar_event(user, after):
+    settings = user["settings"]
+    wanted = [k for k, label in ADHKAR_PRAYERS.items() if settings.get(ADHKAR_SETTINGS[label], True)]
+    if not wanted:
+        return None
+    user_tz = resolve_timezone(user["timezone"], user["lon"])
+    local_day = after.astimezone(user_tz).date()
+    for offset in range(3):
+        day = local_day + timedelta(days=offset)
+        timings = get_timings_cached(user["lat"], user["lon"], day, user["timezone"], PRAYER_METHOD)
+        for key in wanted:
+            if timings[key] == "--:--":
+                continue
+            fire_at = _prayer_datetime(user_tz, day, timings[key]) + ADHKAR_DELAY
+            if fire_at > after:
+                return fire_at, ADHKAR_PRAYERS[key]
+    return None
+
+
+# 🌙 موعد الجمعة التالي في منطقة زمنية
+def next_jumuah_time(tz_name, lon, after):
+    user_tz = resolve_timezone(tz_name, lon)
+    local_now = after.astimezone(user_tz)
+    days_ahead = (JUMUAH_WEEKDAY - local_now.weekday()) % 7
+    day = local_now.date() + timedelta(days=days_ahead)
+    fire_at = localize(user_tz, datetime(day.year, day.month, day.day, JUMUAH_HOUR)).astimezone(utc)
+    if fire_at <= after:
+        day += timedelta(days=7)
+        fire_at = localize(user_tz, datetime(day.year, day.month, day.day, JUMUAH_HOUR)).astimezone(utc)
+    return fire_at
+
+
+# المستخدم بتوقيت "auto" فقط يُجدول منفردًا، والباقون عبر حدث منطقته
+def next_jumuah_event(user, after):
+    return next_jumuah_time(user["timezone"], user["lon"], after), "jumuah"
+
+
+EVENT_KINDS = {
+    "prayer": next_prayer_event,
+    "adhkar": next_adhkar_event,
+    "jumuah": next_jumuah_event,
+}
+
+
+def _wanted_kinds(user):
+    settings = user["settings"]
+    if not user.get("notifications_enabled", True):
+        return []
+    kinds = []
+    if user.get("lat") and user.get("lon") and settings.get("prayer", True):
+        kinds += ["prayer", "adhkar"]
+    if settings.get("jumuah", True) and not has_zone(user):
+        kinds.append("jumuah")
+    return kinds
+
+
+def has_zone(user):
+    return bool(user.get("timezone")) and user["timezone"] != "auto"
+
+
+# ⏰ جدولة التذكيرات بكومة صغرى لمواعيد الإطلاق التالية
+class ReminderScheduler:
+    def __init__(self, dispatch, load_user, owns=lambda user_id: True):
+        self.dispatch = dispatch
+        self.load_user = load_user
+        self.owns = owns
+        self._heap = []
+        self._seq = itertools.count()
+        self._users = {}
+        self._versions = {}
+        self._zones = set()
+        self._retries = {}
+        self._cond = threading.Condition()
+
+    # ✅ حساب الموعد التالي خارج القفل؛ أي خطأ يُسجَّل للمستخدم ويُعاد لاحقًا بدل إسقاط التذكير
+    def reschedule(self, user_id, kind, after, version):
+        with self._cond:
+            user = self._users.get(user_id)
+            if not user or self._versions.get(user_id) != version:
+                return
+        try:
+            event = EVENT_KINDS[kind](user, after)
+            reason = None if event else "لا يوجد موعد قادم"
+        except Exception as e:
+            event, reason = None, e
+
+        with self._cond:
+            if self._versions.get(user_id) != version:
+                return
+            if event:
+                fire_at, label = event
+                self._retries.pop((user_id, kind), None)
+            else:
+                attempt = self._retries.get((user_id, kind), 0) + 1
+                self._retries[(user_id, kind)] = attempt
+                delay = min(RETRY_BASE * 2 ** (attempt - 1), RETRY_MAX)
+                print(f"[ERROR] جدولة {kind} للمستخدم {user_id}: {reason} — إعادة المحاولة بعد {delay}")
+                fire_at, label = datetime.now(utc) + delay, RETRY
+            heapq.heappush(self._heap, (fire_at, next(self._seq), user_id, kind, label, version))
+            self._cond.notify()
+
+    # 🌍 حدث جمعة واحد لكل منطقة زمنية بدل حدث لكل مستخدم
+    def _push_zone(self, tz_name, after):
+        try:
+            fire_at, marker = next_jumuah_time(tz_name, None, after), None
+        except Exception as e:
+            print(f"[ERROR] جدولة الجمعة للمنطقة {tz_name}: {e}")
+            fire_at, marker = datetime.now(utc) + RETRY_BASE, RETRY
+        heapq.heappush(self._heap, (fire_at, next(self._seq), None, "jumuah_zone", tz_name, marker))
+
+    def _ensure_zone(self, tz_name, now):
+        if tz_name not in self._zones:
+            self._zones.add(tz_name)
+            self._push_zone(tz_name, now)
+
+    def add_zone(self, tz_name):
+        with self._cond:
+            self._ensure_zone(tz_name, datetime.now(utc))
+            self._cond.notify()
+
+    # ✅ إضافة/تحديث مستخدم: الإدخالات القديمة تُهمل عند خروجها من الكومة
+    def update_user(self, user_id, user=None):
+        if user is None:
+            user = self.load_user(user_id)
+        owned = self.owns(user_id)
+        now = datetime.now(utc)
+        with self._cond:
+            self._versions[user_id] = version = self._versions.get(user_id, 0) + 1
+            for key in [k for k in self._retries if k[0] == user_id]:
+                del self._retries[key]
+            kinds = _wanted_kinds(user) if user and owned else []
+            if user and has_zone(user) and user["settings"].get("jumuah", True):
+                self._ensure_zone(user["timezone"], now)
+            if not kinds:
+                self._users.pop(user_id, None)
+                return
+            self._users[user_id] = user
+        for kind in kinds:
+            self.reschedule(user_id, kind, now, version)
+
+    def _pop_due(self):
+        with self._cond:
+            while True:
+                now = datetime.now(utc)
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    fire_at, _, user_id, kind, label, version = heapq.heappop(self._heap)
+                    if kind == "jumuah_zone":
+                        if version == RETRY:
+                            self._push_zone(label, now)
+                            continue
+                        due.append((fire_at, None, kind, label, None))
+                        self._push_zone(label, fire_at)
+                        continue
+                    if self._versions.get(user_id) != version:
+                        continue
+                    due.append((fire_at, user_id, kind, label, version))
+                if due:
+                    return due
+                timeout = MAX_SLEEP
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+                self._cond.wait(timeout=max(timeout, 0))
+
+    def run(self):
+        while True:
+            for fire_at, user_id, kind, label, version in self._pop_due():
+                if label == RETRY:
+                    self.reschedule(user_id, kind, datetime.now(utc), version)
+                    continue
+                try:
+                    self.dispatch(user_id, kind, label, fire_at)
+                except Exception as e:
+                    print(f"[ERROR] إرسال التذكير {kind}:{label} للمستخدم {user_id}: {e}")
+                if user_id is not None:
+                    self.reschedule(user_id, kind, fire_at, version)
+
+    def size(self):
+        with self._cond:
+            return len(self._heap)
@@ -0,0 +1,85 @@
+import sys
+import time
+from datetime import datetime
+from utils.hadith_data import books_col, books_cache, fetch_books, fetch_hadith_page, save_page
+
+REQUEST_DELAY = 1.0
+MAX_RETRIES = 5
+
+
+def _fetch_with_retry(fetch, *args):
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            return fetch(*args)
+        except Exception as e:
+            if attempt == MAX_RETRIES:
+                raise
+            wait = REQUEST_DELAY * 2 ** attempt
+            print(f"[ERROR] {e} — إعادة المحاولة بعد {wait:.0f} ث")
+            time.sleep(wait)
+
+
+def sync_books():
+    books = _fetch_with_retry(fetch_books)
+    for order, book in enumerate(books):
+        books_col.update_one({"_id": book["bookSlug"]}, {"$set": {**book, "order": order}}, upsert=True)
+    books_cache.invalidate()
+    return books
+
+
+# 🔄 مزامنة كتاب واحد صفحة بصفحة، مع حفظ آخر صفحة مكتملة للاستئناف
+# recheck=True يعيد فحص كل الصفحات من البداية (يحدّث فقط ما تغيّر)
+def sync_book(book_slug, recheck=False):
+    doc = books_col.find_one({"_id": book_slug}) or {}
+    sync = doc.get("sync") or {}
+    # آخر صفحة محفوظة قد تكون ناقصة (أحاديث أضيفت لاحقًا) لذا نعيد جلبها
+    page = 1 if recheck else max(sync.get("last_page_done", 0), 1)
+    last_page = page
+    changed = 0
+
+    while page <= last_page:
+        page_data = _fetch_with_retry(fetch_hadith_page, book_slug, page)
+        last_page = page_data["last_page"]
+        if not page_data["data"]:
+            break
+        if save_page(book_slug, page, page_data):
+            changed += 1
+        books_col.update_one(
+            {"_id": book_slug},
+            {"$set": {
+                "sync.last_page_done": page,
+                "sync.last_page": last_page,
+                "sync.total": page_data["total"],
+                "sync.per_page": page_data["per_page"],
+                "sync.updated_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+        print(f"📜 {book_slug}: صفحة {page}/{last_page}")
+        page += 1
+        time.sleep(REQUEST_DELAY)
+
+    return changed
+
+
+# الاستخدام: python -m tasks.sync_hadith [--recheck] [book-slug ...]
+def sync_hadith(book_slugs=None, recheck=False):
+    books = sync_books()
+    results = {}
+    for book in books:
+        slug = book["bookSlug"]
+        if book_slugs and slug not in book_slugs:
+            continue
+        try:
+            results[slug] = sync_book(slug, recheck=recheck)
+        except Exception as e:
+            print(f"[ERROR] مزامنة {slug}: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    recheck = "--recheck" in args
+    results = sync_hadith([a for a in args if not a.startswith("--")] or None, recheck=recheck)
+    for slug, changed in results.items():
+        print(f"✅ {slug}: {changed} صفحة جديدة/محدّثة")
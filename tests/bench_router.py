@@ -0,0 +1,48 @@
+import timeit
+from utils.router import CallbackRouter
+
+# ⏱️ مقارنة زمن إيجاد معالج الزر: قاموس CallbackRouter مقابل فحص الدوال واحدة تلو الأخرى
+# (كما كان telebot يفعل مع كل callback_query_handler مسجل)
+# الاستخدام: python -m tests.bench_router
+NAMESPACES = [
+    "main_menu", "back_to_main", "menu", "settings", "settings:toggle", "settings:method", "settings:school",
+    "athkar", "athkar_morning", "athkar_evening", "athkar_sleep", "athkar_prayer", "ayah", "random_ayah",
+    "browse_quran", "surah", "nav", "listen_audio", "play_surah", "stop_surah", "fav", "quran_search",
+    "reciter", "hadith", "hadith:page", "hadith:more", "hadith:fav", "hadith:search", "prayer", "notify",
+    "complaint", "reply", "close", "admin", "broadcast",
+]
+# أسوأ حالة للفحص الخطي: الزر المطلوب آخر المسجلين، مع الصيغة القديمة
+SAMPLES = ["broadcast:confirm", "nav_2_255", "hadith:page:bukhari:3:7", "main_menu"]
+
+
+def build_router():
+    router = CallbackRouter()
+    for namespace in NAMESPACES:
+        router.route(namespace)(lambda call: None)
+    return router
+
+
+def build_predicates():
+    predicates = []
+    for namespace in NAMESPACES:
+        predicates.append((lambda data, ns=namespace: data == ns or data.startswith(ns + ":") or data.startswith(ns + "_"), None))
+    return predicates
+
+
+def linear_resolve(predicates, data):
+    for predicate, handler in predicates:
+        if predicate(data):
+            return handler
+    return None
+
+
+def main(number=200000):
+    router, predicates = build_router(), build_predicates()
+    for data in SAMPLES:
+        routed = timeit.timeit(lambda: router.resolve(data), number=number) / number * 1e6
+        linear = timeit.timeit(lambda: linear_resolve(predicates, data), number=number) / number * 1e6
+        print(f"{data:<28} dict {routed:6.2f}µs   linear {linear:6.2f}µs")
+
+
+if __name__ == "__main__":
+    main()
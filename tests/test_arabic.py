@@ -0,0 +1,54 @@
+from utils.arabic import normalize, tokenize, tokenize_variants
+from utils.search_index import InvertedIndex
+
+
+# كلمات بالرسم العثماني (كما في نص quran-uthmani) مقابل ما يكتبه المستخدم
+UTHMANI_TO_TYPED = [
+    ("ٱلْعَـٰلَمِينَ", "العالمين"),
+    ("ٱلْكِتَـٰبُ", "الكتاب"),
+    ("ٱلصَّلَوٰةَ", "الصلاة"),
+    ("ٱلزَّكَوٰةَ", "الزكاة"),
+    ("ٱلْحَيَوٰةِ", "الحياة"),
+    ("ٱلرِّبَوٰا۟", "الربا"),
+    ("ٱلسَّمَـٰوَٰتِ", "السماوات"),
+    ("عَلَىٰ", "على"),
+    ("مُوسَىٰ", "موسى"),
+    ("ءَامَنُوا۟", "آمنوا"),
+]
+
+# كلمات يحذف الإملاء الحديث ألفها الخنجرية
+DAGGER_DROPPED = [
+    ("هَـٰذَا", "هذا"),
+    ("ذَٰلِكَ", "ذلك"),
+    ("ٱلرَّحْمَـٰنِ", "الرحمن"),
+    ("إِلَـٰهَ", "إله"),
+]
+
+
+def test_uthmani_forms_normalize_like_typed_queries():
+    for uthmani, typed in UTHMANI_TO_TYPED:
+        assert normalize(uthmani) == normalize(typed), (uthmani, typed)
+
+
+def test_dropped_dagger_alef_is_indexed_as_a_variant():
+    for uthmani, typed in DAGGER_DROPPED:
+        [forms] = tokenize_variants(uthmani)
+        assert tokenize(typed)[0] in forms, (uthmani, typed)
+
+
+def test_variants_keep_positions_aligned():
+    text = "ذَٰلِكَ ٱلْكِتَـٰبُ لَا رَيْبَ فِيهِ"
+    assert len(tokenize_variants(text)) == len(tokenize(text)) == 5
+
+
+def test_index_matches_typed_spelling():
+    index = InvertedIndex()
+    index.add_document(1, "ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَـٰلَمِينَ")
+    index.add_document(2, "ٱلرَّحْمَـٰنِ ٱلرَّحِيمِ")
+    index.add_document(3, "وَأَقِيمُوا۟ ٱلصَّلَوٰةَ وَءَاتُوا۟ ٱلزَّكَوٰةَ")
+    index.add_document(4, "ذَٰلِكَ ٱلْكِتَـٰبُ لَا رَيْبَ ۛ فِيهِ")
+
+    assert [d for d, _ in index.search("العالمين")[0]] == [1]
+    assert [d for d, _ in index.search("الرحمن")[0]] == [2]
+    assert [d for d, _ in index.search("الصلاة الزكاة")[0]] == [3]
+    assert [d for d, _ in index.search('"ذلك الكتاب"')[0]] == [4]
@@ -0,0 +1,55 @@
+from datetime import date
+from utils.prayer_times import TIMING_KEYS, get_timings
+
+
+# القيم المرجعية من مكتبة PrayTimes 2.3 (التي تنقلها مكتبة aladhan) بإعدادات aladhan الافتراضية:
+# معالجة خطوط العرض العليا AngleBased، والعشاء "90 min" = المغرب + 90 دقيقة
+# الترتيب: الفجر، الشروق، الظهر، العصر، الغروب، المغرب، العشاء
+REFERENCE = [
+    ("Makkah", 21.4225, 39.8262, "Asia/Riyadh", 4, date(2024, 3, 15), "05:13 06:29 12:29 15:54 18:30 18:30 20:00"),
+    ("Makkah", 21.4225, 39.8262, "Asia/Riyadh", 4, date(2024, 6, 21), "04:11 05:39 12:23 15:42 19:06 19:06 20:36"),
+    ("Makkah", 21.4225, 39.8262, "Asia/Riyadh", 4, date(2024, 12, 21), "05:32 06:54 12:19 15:23 17:44 17:44 19:14"),
+    ("Cairo", 30.0444, 31.2357, "Africa/Cairo", 5, date(2024, 3, 15), "04:38 06:05 12:04 15:29 18:04 18:04 19:21"),
+    ("Cairo", 30.0444, 31.2357, "Africa/Cairo", 5, date(2024, 6, 21), "04:08 05:54 12:57 16:32 19:59 19:59 21:33"),
+    ("Cairo", 30.0444, 31.2357, "Africa/Cairo", 5, date(2024, 12, 21), "05:14 06:47 11:53 14:41 17:00 17:00 18:23"),
+    ("London", 51.5074, -0.1278, "Europe/London", 3, date(2024, 3, 15), "04:21 06:14 12:09 15:21 18:06 18:06 19:52"),
+    ("London", 51.5074, -0.1278, "Europe/London", 3, date(2024, 6, 21), "02:31 04:43 13:02 17:25 21:22 21:22 23:27"),
+    ("London", 51.5074, -0.1278, "Europe/London", 3, date(2024, 12, 21), "06:00 08:04 11:59 13:38 15:54 15:54 17:51"),
+    ("New York", 40.7128, -74.006, "America/New_York", 2, date(2024, 3, 15), "05:52 07:07 13:05 16:26 19:03 19:03 20:19"),
+    ("New York", 40.7128, -74.006, "America/New_York", 2, date(2024, 6, 21), "03:45 05:25 12:58 16:58 20:31 20:31 22:11"),
+    ("New York", 40.7128, -74.006, "America/New_York", 2, date(2024, 12, 21), "05:54 07:17 11:54 14:14 16:32 16:32 17:54"),
+    ("Karachi", 24.8607, 67.0011, "Asia/Karachi", 1, date(2024, 3, 15), "05:25 06:41 12:41 16:06 18:41 18:41 19:57"),
+    ("Karachi", 24.8607, 67.0011, "Asia/Karachi", 1, date(2024, 6, 21), "04:14 05:43 12:34 15:55 19:24 19:24 20:54"),
+    ("Karachi", 24.8607, 67.0011, "Asia/Karachi", 1, date(2024, 12, 21), "05:51 07:12 12:30 15:28 17:48 17:48 19:10"),
+    ("Jakarta", -6.2088, 106.8456, "Asia/Jakarta", 20, date(2024, 3, 15), "04:40 05:57 12:01 15:09 18:06 18:06 19:15"),
+    ("Jakarta", -6.2088, 106.8456, "Asia/Jakarta", 20, date(2024, 6, 21), "04:38 06:02 11:54 15:16 17:47 17:47 19:02"),
+    ("Jakarta", -6.2088, 106.8456, "Asia/Jakarta", 20, date(2024, 12, 21), "04:11 05:36 11:51 15:18 18:05 18:05 19:22"),
+    ("Istanbul", 41.0082, 28.9784, "Europe/Istanbul", 13, date(2024, 3, 15), "05:44 07:15 13:13 16:34 19:11 19:11 20:37"),
+    ("Istanbul", 41.0082, 28.9784, "Europe/Istanbul", 13, date(2024, 6, 21), "03:24 05:32 13:06 17:07 20:40 20:40 22:38"),
+    ("Istanbul", 41.0082, 28.9784, "Europe/Istanbul", 13, date(2024, 12, 21), "06:46 08:26 13:02 15:21 17:39 17:39 19:13"),
+    ("Dubai", 25.2048, 55.2708, "Asia/Dubai", 8, date(2024, 3, 15), "05:05 06:28 12:28 15:53 18:28 18:28 19:58"),
+    ("Dubai", 25.2048, 55.2708, "Asia/Dubai", 8, date(2024, 6, 21), "03:52 05:30 12:21 15:43 19:12 19:12 20:42"),
+    ("Dubai", 25.2048, 55.2708, "Asia/Dubai", 8, date(2024, 12, 21), "05:31 07:00 12:17 15:15 17:34 17:34 19:04"),
+]
+
+TROMSO = (69.6496, 18.956, "Europe/Oslo")
+
+
+def test_parity_with_praytimes_reference():
+    for city, lat, lon, tz_name, method, day, expected in REFERENCE:
+        timings = get_timings(lat, lon, day, tz_name, method)
+        assert " ".join(timings[k] for k in TIMING_KEYS) == expected, (city, day, method)
+
+
+def test_midnight_sun_has_all_times():
+    # شمس منتصف الليل في ترومسو: لا غروب، وكان العشاء بعد المغرب بـ 90 دقيقة يفشل
+    for method in (4, 8, 10, 3):
+        timings = get_timings(*TROMSO[:2], date(2024, 6, 21), TROMSO[2], method)
+        assert "--:--" not in timings.values(), (method, timings)
+
+
+def test_polar_night_has_all_times():
+    for method in (4, 3):
+        timings = get_timings(*TROMSO[:2], date(2024, 12, 21), TROMSO[2], method)
+        assert "--:--" not in timings.values(), (method, timings)
+        assert timings["Sunrise"] < timings["Dhuhr"] < timings["Sunset"]
@@ -0,0 +1,101 @@
+from math import ceil
+import bson
+import utils.db as db
+
+
+# 📏 قياس تحميل مستخدمي التذكير: عدد الرحلات إلى Mongo وحجم البيانات المنقولة
+# مجموعة وهمية تحسب الاستعلامات (find/getMore/find_one) وحجم BSON لكل مستند مُرجع
+class CountingCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.round_trips = 0
+        self.bytes = 0
+        self.calls = []
+
+    def _project(self, doc, projection):
+        if not projection:
+            return doc
+        return {k: v for k, v in doc.items() if k == "_id" or k in projection}
+
+    def _returned(self, doc):
+        self.bytes += len(bson.encode(doc))
+        return doc
+
+    def find(self, query=None, projection=None, batch_size=101):
+        self.calls.append(("find", projection, batch_size))
+        for i, doc in enumerate(self.docs):
+            if i % batch_size == 0:
+                self.round_trips += 1
+            yield self._returned(self._project(doc, projection))
+
+    def find_one(self, query, projection=None):
+        self.calls.append(("find_one", projection))
+        self.round_trips += 1
+        doc = next((d for d in self.docs if d["_id"] == query["_id"]), None)
+        return self._returned(self._project(doc, projection)) if doc else None
+
+
+def make_users(n, favorites=40):
+    return [
+        {
+            "_id": 100000 + i,
+            "full_name": f"user {i}",
+            "location": {"lat": 21.4 + i % 10, "lon": 39.8},
+            "timezone": "Asia/Riyadh",
+            "reminder_settings": {"prayer": True, "adhkar": i % 2 == 0},
+            "notifications_enabled": True,
+            "favorites": [{"type": "hadith", "content": "حديث " * 40} for _ in range(favorites)],
+        }
+        for i in range(n)
+    ]
+
+
+# الطريقة السابقة: قائمة المعرفات ثم ثلاث find_one كاملة لكل مستخدم
+def legacy_cost(docs):
+    full = sum(len(bson.encode(doc)) for doc in docs)
+    return 1 + 3 * len(docs), 3 * full
+
+
+def measure(monkeypatch, n):
+    users = make_users(n)
+    col = CountingCollection(users)
+    monkeypatch.setattr(db, "user_col", col)
+    loaded = list(db.iter_reminder_users())
+    assert len(loaded) == n
+    return col
+
+
+def test_single_batched_cursor(monkeypatch):
+    col = measure(monkeypatch, 2500)
+    assert col.calls == [("find", db.REMINDER_FIELDS, 1000)]
+    assert col.round_trips == ceil(2500 / 1000)
+
+
+def test_projection_skips_favorites(monkeypatch):
+    users = make_users(500)
+    col = measure(monkeypatch, 500)
+    _, legacy_bytes = legacy_cost(users)
+    assert col.bytes * 50 < legacy_bytes
+
+
+def test_reminder_user_shape(monkeypatch):
+    monkeypatch.setattr(db, "user_col", CountingCollection(make_users(1)))
+    user = db.get_reminder_user(100000)
+    assert user["lat"] == 21.4 and user["timezone"] == "Asia/Riyadh"
+    assert user["settings"]["prayer"] is True and "favorites" not in user
+
+
+# الاستخدام: python -m tests.test_reminder_loading [عدد المستخدمين]
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    users = make_users(n)
+    legacy_trips, legacy_bytes = legacy_cost(users)
+    col = CountingCollection(users)
+    db.user_col = col
+    for _ in db.iter_reminder_users():
+        pass
+    print(f"المستخدمون: {n}")
+    print(f"قبل: {legacy_trips} رحلة، {legacy_bytes / 1e6:.1f} MB")
+    print(f"بعد: {col.round_trips} رحلة، {col.bytes / 1e6:.1f} MB")
@@ -0,0 +1,86 @@
+import pytest
+from utils.router import CallbackRouter, callback_data, MAX_CALLBACK_BYTES
+
+
+def make_router():
+    router = CallbackRouter()
+    handlers = {}
+    for namespace in ("settings:toggle", "settings", "nav", "hadith", "main_menu"):
+        handlers[namespace] = router.route(namespace)(lambda call, ns=namespace: ns)
+    return router, handlers
+
+
+def test_namespace_action_form():
+    router, handlers = make_router()
+    assert router.parse("settings:toggle:prayer") == ("settings:toggle", ["prayer"])
+    assert router.resolve("settings:toggle:prayer")[0] is handlers["settings:toggle"]
+
+
+def test_namespace_falls_back_when_action_is_not_registered():
+    router, handlers = make_router()
+    assert router.parse("settings:method:4") == ("settings", ["method", "4"])
+    assert router.resolve("hadith:page:bukhari:3:7") == (handlers["hadith"], ["page", "bukhari", "3", "7"])
+
+
+def test_bare_namespace():
+    router, handlers = make_router()
+    assert router.parse("main_menu") == ("main_menu", [])
+    assert router.resolve("main_menu")[0] is handlers["main_menu"]
+
+
+def test_legacy_underscore_form():
+    router, handlers = make_router()
+    assert router.parse("nav_2_255") == ("nav", ["2", "255"])
+    assert router.resolve("nav_2_255") == (handlers["nav"], ["2", "255"])
+
+
+def test_unmatched_data():
+    router, _ = make_router()
+    for data in ("unknown", "unknown:action", "foo_bar", "", None):
+        assert router.resolve(data) == (None, [])
+
+
+def test_duplicate_route_raises():
+    router, _ = make_router()
+    with pytest.raises(ValueError):
+        router.route("nav")(lambda call: None)
+    with pytest.raises(ValueError):
+        router.route("new", "new")(lambda call: None)
+
+
+def test_dispatch_answers_unmatched_calls():
+    router, _ = make_router()
+    answered = []
+
+    class Bot:
+        def answer_callback_query(self, call_id):
+            answered.append(call_id)
+
+    class Call:
+        id, data = "42", "unknown:x"
+
+    router.dispatch(Bot(), Call())
+    assert answered == ["42"] and router.stats["unmatched"] == 1
+
+
+def test_dispatch_passes_parsed_args():
+    router = CallbackRouter()
+    received = []
+    router.route("fav_delete")(lambda call, *args: received.append(args))
+    router.route("nav")(lambda call, surah, ayah: received.append((surah, ayah)))
+
+    class Call:
+        id = "1"
+
+        def __init__(self, data):
+            self.data = data
+
+    router.dispatch(None, Call("fav_delete:quran:3:0"))
+    router.dispatch(None, Call("nav_2_255"))
+    assert received == [("quran", "3", "0"), ("2", "255")]
+
+
+def test_callback_data_limit():
+    assert callback_data("hadith", "page", "bukhari", 3, 7) == "hadith:page:bukhari:3:7"
+    with pytest.raises(ValueError):
+        callback_data("hadith", "x" * MAX_CALLBACK_BYTES)
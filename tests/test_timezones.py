@@ -0,0 +1,20 @@
+from utils.timezones import timezone_at
+
+
+# مدن قريبة من الحدود كان أقرب نقطة مرجعية فيها من دولة مجاورة
+BORDER_CITIES = [
+    ("Vigo", 42.24, -8.72, "Europe/Madrid"),
+    ("Amritsar", 31.63, 74.87, "Asia/Kolkata"),
+    ("Abadan", 30.34, 48.30, "Asia/Tehran"),
+    ("Tindouf", 27.67, -8.15, "Africa/Algiers"),
+    ("Makkah", 21.42, 39.83, "Asia/Riyadh"),
+]
+
+
+def test_border_cities_get_their_own_zone():
+    for name, lat, lon, zone in BORDER_CITIES:
+        assert timezone_at(lat, lon) == zone, name
+
+
+def test_open_sea_gets_nautical_zone():
+    assert timezone_at(0, -30) == "Etc/GMT+2"
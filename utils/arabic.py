@@ -0,0 +1,54 @@
+import re
+
+# 🔤 توحيد النص العربي للبحث: حذف التشكيل والتطويل وتوحيد أشكال الألف والهمزة والياء والتاء المربوطة
+# (الهمزة المنفردة تُحذف حتى تطابق "ءامنوا" في الرسم العثماني "آمنوا")
+_TASHKEEL = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u08d3-\u08ff]")
+_TATWEEL = "\u0640"
+_HARAKAT = "[\u064b-\u065f]*"
+# الألف الخنجرية تُقرأ ألفًا (ٱلْعَـٰلَمِينَ = العالمين) لكن الإملاء الحديث يحذفها أحيانًا (هَـٰذَا = هذا)
+_DAGGER_ALEF = "\u0670"
+# الواو المرسومة مكان الألف قبل التاء المربوطة أو الألف: ٱلصَّلَوٰةَ = الصلاة، ٱلرِّبَوٰا۟ = الربا
+_UTHMANI_WAW = re.compile("و" + _HARAKAT + _DAGGER_ALEF + "(?=" + _HARAKAT + "[ةا])")
+# الألف الخنجرية فوق الألف المقصورة لا تُكتب: عَلَىٰ = على
+_MAQSURA_DAGGER = re.compile("(ى" + _HARAKAT + ")" + _DAGGER_ALEF)
+_DOUBLE_ALEF = re.compile("ا{2,}")
+_NON_LETTERS = re.compile(r"[^\w\s]|_|\d")
+
+_CHAR_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ٲ": "ا", "ٳ": "ا",
+    "ؤ": "و",
+    "ئ": "ي", "ى": "ي", "ی": "ي",
+    "ة": "ه",
+    "ء": None,
+    "ک": "ك",
+})
+
+
+def _fold_uthmani(text):
+    text = (text or "").replace(_TATWEEL, "")
+    text = _UTHMANI_WAW.sub("ا", text)
+    return _MAQSURA_DAGGER.sub(r"\1", text)
+
+
+def _finish(text):
+    text = _TASHKEEL.sub("", text)
+    text = text.translate(_CHAR_MAP)
+    text = _DOUBLE_ALEF.sub("ا", text)
+    text = _NON_LETTERS.sub(" ", text)
+    return text.lower()
+
+
+def normalize(text):
+    return _finish(_fold_uthmani(text).replace(_DAGGER_ALEF, "ا"))
+
+
+def tokenize(text):
+    return normalize(text).split()
+
+
+# ✅ للفهرسة: لكل موضع الشكل بالألف الخنجرية ألفًا وبدونها، حتى يطابق البحث الإملاءين
+def tokenize_variants(text):
+    folded = _fold_uthmani(text)
+    full = _finish(folded.replace(_DAGGER_ALEF, "ا")).split()
+    bare = _finish(folded.replace(_DAGGER_ALEF, "")).split()
+    return [{a, b} for a, b in zip(full, bare)]
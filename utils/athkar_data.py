@@ -0,0 +1,173 @@
+import os
+import json
+import hashlib
+import threading
+import time
+import requests
+
+# 📿 بيانات الأذكار (muslimKit) محفوظة على القرص مع إعادة التحقق عبر ETag
+ATHKAR_API = "https://ahegazy.github.io/muslimKit/json/"
+DATASETS = {
+    "morning": "azkar_sabah.json",
+    "evening": "azkar_massa.json",
+    "post_prayer": "PostPrayer_azkar.json"
+}
+# اسم القسم كما يظهر للمستخدم -> اسم مجموعة البيانات
+CATEGORIES = {
+    "الصباح": "morning",
+    "المساء": "evening",
+    "بعد الصلاة": "post_prayer"
+}
+CATEGORY_TITLES = {name: title for title, name in CATEGORIES.items()}
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache", "athkar")
+REVALIDATE_SECONDS = 6 * 3600
+
+_datasets = {}
+_rendered = {}
+_lock = threading.Lock()
+_refreshing = set()
+
+
+def _paths(name):
+    return os.path.join(CACHE_DIR, DATASETS[name]), os.path.join(CACHE_DIR, DATASETS[name] + ".meta")
+
+
+def _read_disk(name):
+    data_path, meta_path = _paths(name)
+    if not os.path.exists(data_path):
+        return None
+    with open(data_path, encoding="utf-8") as f:
+        content = json.load(f).get("content", [])
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    return {"content": content, "etag": meta.get("etag"), "version": meta.get("version"), "checked_at": meta.get("checked_at", 0)}
+
+
+def _write_disk(name, raw):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data_path, _ = _paths(name)
+    tmp = data_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, data_path)
+
+
+def _write_meta(name, entry):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _, meta_path = _paths(name)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"etag": entry.get("etag"), "version": entry.get("version"), "checked_at": entry.get("checked_at", 0)}, f)
+
+
+# 🔄 جلب الملف فقط إذا تغيّر (If-None-Match)، ويرجع True عند تغيّر المحتوى
+def revalidate(name):
+    current = _datasets.get(name) or _read_disk(name)
+    headers = {}
+    if current and current.get("etag"):
+        headers["If-None-Match"] = current["etag"]
+
+    res = requests.get(f"{ATHKAR_API}{DATASETS[name]}", headers=headers, timeout=10)
+    now = time.time()
+    if res.status_code == 304 and current:
+        current["checked_at"] = now
+        _write_meta(name, current)
+        with _lock:
+            _datasets[name] = current
+        return False
+
+    res.raise_for_status()
+    raw = res.content
+    version = hashlib.sha1(raw).hexdigest()[:12]
+    entry = {
+        "content": json.loads(raw.decode("utf-8")).get("content", []),
+        "etag": res.headers.get("ETag"),
+        "version": version,
+        "checked_at": now
+    }
+    _write_disk(name, raw)
+    _write_meta(name, entry)
+    with _lock:
+        changed = not current or current.get("version") != version
+        _datasets[name] = entry
+    return changed
+
+
+def _revalidate_in_background(name):
+    with _lock:
+        if name in _refreshing:
+            return
+        _refreshing.add(name)
+
+    def run():
+        try:
+            revalidate(name)
+        except Exception as e:
+            print(f"[ERROR] تحديث بيانات الأذكار {name}: {e}")
+        finally:
+            with _lock:
+                _refreshing.discard(name)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+# ✅ بيانات مجموعة أذكار: من الذاكرة ثم القرص، والشبكة فقط إذا لم تكن محفوظة
+def get_dataset(name):
+    entry = _datasets.get(name)
+    if entry is None:
+        entry = _read_disk(name)
+        if entry is None:
+            revalidate(name)
+            entry = _datasets[name]
+        with _lock:
+            _datasets.setdefault(name, entry)
+    if time.time() - entry.get("checked_at", 0) > REVALIDATE_SECONDS:
+        _revalidate_in_background(name)
+    return entry
+
+
+def get_athkar(name):
+    return get_dataset(name)["content"]
+
+
+# يقبل اسم المجموعة (morning) أو عنوان القسم القديم (الصباح) من أزرار الرسائل السابقة
+def resolve_category(value):
+    if value in DATASETS:
+        return value
+    return CATEGORIES.get(value)
+
+
+# ✅ عند التشغيل: تحميل كل المجموعات من القرص (أو الشبكة إن لم تكن محفوظة) ثم تحديثها دوريًا
+def warm_athkar():
+    def run():
+        while True:
+            for name in DATASETS:
+                try:
+                    get_dataset(name)
+                except Exception as e:
+                    print(f"[ERROR] تحميل بيانات الأذكار {name}: {e}")
+            time.sleep(REVALIDATE_SECONDS / 4)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+# 📝 رسالة أذكار الصباح/المساء تُبنى مرة واحدة لكل نسخة من المحتوى
+def get_adhkar_message(time_of_day, limit=10):
+    entry = get_dataset(time_of_day)
+    key = (time_of_day, entry["version"], limit)
+    message = _rendered.get(key)
+    if message is not None:
+        return message
+
+    message = f"📿 أذكار {'الصباح' if time_of_day == 'morning' else 'المساء'}:\n" + "-"*50 + "\n"
+    for i, item in enumerate(entry["content"][:limit], 1):
+        text = item.get("zekr", "").strip()
+        repeat = item.get("repeat", "غير مذكور")
+        message += f"{i}. 📖 {text}\n🔁 التكرار: {repeat}\n\n"
+
+    with _lock:
+        for old in [k for k in _rendered if k[0] == time_of_day]:
+            del _rendered[old]
+        _rendered[key] = message
+    return message
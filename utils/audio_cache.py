@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from telebot.apihelper import ApiTelegramException
+from utils.db import db
+from config import AUDIO_CACHE_CHANNEL_ID
+from utils.sender import send, PRIORITY_NOTIFY, PRIORITY_BROADCAST
+
+audio_col = db["audio_file_ids"]
+
+
+# 🎧 ذاكرة file_id لملفات التلاوة: (القارئ، السورة، الآية) -> file_id من تيليجرام
+# بعد أول رفع ناجح يُرسل الملف بمعرّفه دون أن يعيد تيليجرام تنزيله من الرابط
+class AudioFileCache:
+    def __init__(self, collection, max_size=100000):
+        self.collection = collection
+        self.max_size = max_size
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(reciter, surah, ayah):
+        return f"{reciter}:{int(surah)}:{int(ayah)}"
+
+    def _remember(self, key, file_id):
+        with self._lock:
+            self._local[key] = file_id
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def get(self, reciter, surah, ayah):
+        key = self.key(reciter, surah, ayah)
+        with self._lock:
+            file_id = self._local.get(key)
+            if file_id is not None:
+                self._local.move_to_end(key)
+                return file_id
+        doc = self.collection.find_one({"_id": key}, {"file_id": 1})
+        if doc:
+            self._remember(key, doc["file_id"])
+            return doc["file_id"]
+        return None
+
+    def set(self, reciter, surah, ayah, file_id):
+        key = self.key(reciter, surah, ayah)
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {"file_id": file_id, "reciter": reciter, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        self._remember(key, file_id)
+
+    def forget(self, reciter, surah, ayah):
+        key = self.key(reciter, surah, ayah)
+        self.collection.delete_one({"_id": key})
+        with self._lock:
+            self._local.pop(key, None)
+
+    def count(self, reciter=None):
+        return self.collection.count_documents({"reciter": reciter} if reciter else {})
+
+    def cached_keys(self, reciter):
+        return {doc["_id"] for doc in self.collection.find({"reciter": reciter}, {"_id": 1})}
+
+
+audio_cache = AudioFileCache(audio_col)
+
+
+def file_id_of(message):
+    audio = getattr(message, "audio", None) or getattr(message, "voice", None) or getattr(message, "document", None)
+    return audio.file_id if audio else None
+
+
+# ❌ معرّف الملف المحفوظ لم يعد صالحًا (وليس أي خطأ 400 آخر مثل محادثة غير موجودة)
+# مثل: "wrong file identifier/HTTP URL specified"، "wrong remote file identifier"، "invalid file_id"
+STALE_FILE_ID_MARKERS = ("file identifier", "file_id")
+
+
+def is_stale_file_id(error):
+    if not isinstance(error, ApiTelegramException) or error.error_code != 400:
+        return False
+    description = (error.description or "").lower()
+    return any(marker in description for marker in STALE_FILE_ID_MARKERS)
+
+
+# ✅ إرسال تلاوة آية: بالمعرّف المحفوظ إن وجد، وإلا بالرابط ثم حفظ المعرّف الناتج
+def send_ayah_audio(bot, chat_id, reciter, surah, ayah, url, **kwargs):
+    file_id = audio_cache.get(reciter, surah, ayah)
+    if file_id:
+        try:
+            return bot.send_audio(chat_id, file_id, **kwargs)
+        except ApiTelegramException as e:
+            if not is_stale_file_id(e):
+                raise
+            # معرّف لم يعد صالحًا: نحذفه ونرفع من الرابط من جديد
+            audio_cache.forget(reciter, surah, ayah)
+
+    message = bot.send_audio(chat_id, url, **kwargs)
+    file_id = file_id_of(message)
+    if file_id:
+        audio_cache.set(reciter, surah, ayah, file_id)
+    return message
+
+
+# ✅ مثل send_ayah_audio لكن عبر طابور الإرسال مع انتظار النتيجة (لتشغيل السورة بالترتيب)
+def queue_ayah_audio(chat_id, reciter, surah, ayah, url, priority=PRIORITY_NOTIFY, timeout=120, **kwargs):
+    file_id = audio_cache.get(reciter, surah, ayah)
+    if file_id:
+        job = send("send_audio", chat_id, file_id, priority=priority, **kwargs)
+        if job.wait(timeout):
+            return job.result
+        if not is_stale_file_id(job.error):
+            return None
+        audio_cache.forget(reciter, surah, ayah)
+
+    job = send("send_audio", chat_id, url, priority=priority, **kwargs)
+    if not job.wait(timeout):
+        return None
+    file_id = file_id_of(job.result)
+    if file_id:
+        audio_cache.set(reciter, surah, ayah, file_id)
+    return job.result
+
+
+# ⚡ تسخين تلاوة آية واحدة (للتحميل المسبق): رفعها إلى قناة الذاكرة إن لم تكن محفوظة
+# لا ينتظر الرفع؛ يحفظ المعرّف عند اكتماله، وبحد أقصى MAX_WARM_UPLOADS رفعًا في نفس الوقت
+MAX_WARM_UPLOADS = 2
+_warming = set()
+_warming_lock = threading.Lock()
+
+
+def warm_ayah_audio(reciter, surah, ayah, url, channel_id=AUDIO_CACHE_CHANNEL_ID):
+    if not channel_id or audio_cache.get(reciter, surah, ayah):
+        return False
+    key = audio_cache.key(reciter, surah, ayah)
+    with _warming_lock:
+        if key in _warming or len(_warming) >= MAX_WARM_UPLOADS:
+            return False
+        _warming.add(key)
+
+    def done(job):
+        try:
+            file_id = file_id_of(job.result) if job.error is None else None
+            if file_id:
+                audio_cache.set(reciter, surah, ayah, file_id)
+        finally:
+            with _warming_lock:
+                _warming.discard(key)
+
+    send("send_audio", channel_id, url, priority=PRIORITY_BROADCAST, on_done=done, caption=f"{reciter} {surah}:{ayah}")
+    return True
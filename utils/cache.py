@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# 🗃️ ذاكرة LRU بمدة صلاحية، مع تحميل واحد فقط لكل مفتاح عند الإخفاق المتزامن
+# (الطلبات الأخرى لنفس المفتاح تنتظر نتيجة التحميل الجاري بدل تكراره)
+class TTLCache:
+    def __init__(self, name, max_size=1000, ttl=3600):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0}
+
+    def _get_locked(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _set_locked(self, key, value, now, ttl):
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._get_locked(key, time.monotonic())
+            return default if entry is None else entry[1]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_locked(key, time.monotonic()) is not None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set_locked(key, value, time.monotonic(), ttl)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    # ✅ القيمة من الذاكرة، أو تحميلها مرة واحدة عبر loader ومشاركتها مع الطلبات المتزامنة
+    def get_or_load(self, key, loader, ttl=None):
+        with self._lock:
+            entry = self._get_locked(key, time.monotonic())
+            if entry is not None:
+                self._stats["hits"] += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["shared"] += 1
+                owner = False
+            else:
+                self._stats["misses"] += 1
+                flight = self._flights[key] = _Flight()
+                owner = True
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            with self._lock:
+                self._set_locked(key, flight.value, time.monotonic(), ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"] + self._stats["shared"]
+            return {
+                "name": self.name,
+                **self._stats,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hit_ratio": ((self._stats["hits"] + self._stats["shared"]) / lookups) if lookups else 0.0
+            }
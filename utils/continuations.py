@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from utils.cache import TTLCache
+
+
+# 📖 مرجع صغير لكل رسالة طويلة (بدل النص نفسه) لعرض بقية الأجزاء لاحقًا
+# LRU بمدة صلاحية في الذاكرة، ومع collection تُحفظ أيضًا في Mongo (فهرس TTL)
+# حتى تعمل الأزرار بعد إعادة التشغيل أو إذا استقبلها نسخة أخرى
+class ContinuationStore:
+    def __init__(self, name, collection=None, max_size=10000, ttl=24 * 3600):
+        self.collection = collection
+        self.ttl = ttl
+        self._cache = TTLCache(name, max_size=max_size, ttl=ttl)
+
+    @staticmethod
+    def key(chat_id, message_id):
+        return f"{chat_id}:{message_id}"
+
+    def ensure_indexes(self):
+        if self.collection is not None:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def put(self, chat_id, message_id, ref):
+        key = self.key(chat_id, message_id)
+        self._cache.set(key, ref)
+        if self.collection is not None:
+            self.collection.update_one(
+                {"_id": key},
+                {"$set": {"ref": ref, "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl)}},
+                upsert=True
+            )
+
+    def get(self, chat_id, message_id):
+        key = self.key(chat_id, message_id)
+        ref = self._cache.get(key)
+        if ref is None and self.collection is not None:
+            doc = self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+            if doc:
+                ref = doc["ref"]
+                self._cache.set(key, ref)
+        return ref
+
+    def stats(self):
+        return self._cache.stats()
@@ -2,6 +2,7 @@ from pymongo import MongoClient
 from config import MONGO_URI, OWNER_ID
 from bson import ObjectId
 from datetime import datetime
+from utils.sender import send, PRIORITY_BROADCAST
 
 client = MongoClient(MONGO_URI)
 db = client["islamic_bot"]
@@ -10,6 +11,19 @@ user_col = db["users"]
 comp_col = db["complaints"]
 admin_col = db["admins"]
 
+# 🔔 مستمعون لتغييرات بيانات التذكير (الموقع، التوقيت، الإعدادات)
+_user_listeners = []
+
+def on_user_changed(callback):
+    _user_listeners.append(callback)
+
+def _notify_user_changed(user_id):
+    for callback in _user_listeners:
+        try:
+            callback(user_id)
+        except Exception as e:
+            print(f"[ERROR] تحديث جدول التذكير للمستخدم {user_id}: {e}")
+
 # ✅ تسجيل المستخدم الجديد
 def register_user(user):
     user_id = user.id if hasattr(user, 'id') else user
@@ -22,18 +36,24 @@ def register_user(user):
             "$set": {
                 "full_name": full_name,
                 "username": username,
+                "blocked": False,
+                "joined": datetime.utcnow(),
+                "reminder_updated_at": datetime.utcnow()
+            },
+            # إعادة /start لا تُلغي اختيارات المستخدم الحالية
+            "$setOnInsert": {
                 "notifications_enabled": True,
                 "reminder_settings": {
                     "morning_adhkar": True,
                     "evening_adhkar": True,
                     "jumuah": True,
                     "prayer": True
-                },
-                "joined": datetime.utcnow()
+                }
             }
         },
         upsert=True
     )
+    _notify_user_changed(user_id)
 
 # 🕌 الموقع والتوقيت
 def set_user_location(user_id, lat, lon, timezone="auto"):
@@ -43,10 +63,12 @@ def set_user_location(user_id, lat, lon, timezone="auto"):
             "location.lat": lat,
             "location.lon": lon,
             "timezone": timezone,
-            "notifications_enabled": True
+            "notifications_enabled": True,
+            "reminder_updated_at": datetime.utcnow()
         }},
         upsert=True
     )
+    _notify_user_changed(user_id)
 
 def get_user_location(user_id):
     user = user_col.find_one({"_id": user_id})
@@ -64,27 +86,80 @@ def user_notifications_enabled(user_id):
     return user.get("notifications_enabled", True) if user else True
 
 def enable_notifications(user_id):
-    user_col.update_one({"_id": user_id}, {"$set": {"notifications_enabled": True}})
+    user_col.update_one({"_id": user_id}, {"$set": {"notifications_enabled": True, "reminder_updated_at": datetime.utcnow()}})
+    _notify_user_changed(user_id)
 
 def disable_notifications(user_id):
-    user_col.update_one({"_id": user_id}, {"$set": {"notifications_enabled": False}})
+    user_col.update_one({"_id": user_id}, {"$set": {"notifications_enabled": False, "reminder_updated_at": datetime.utcnow()}})
+    _notify_user_changed(user_id)
 
 # 🔁 إعدادات التذكير
+DEFAULT_REMINDER_SETTINGS = {
+    "morning_adhkar": True,
+    "evening_adhkar": True,
+    "jumuah": True,
+    "prayer": True
+}
+
 def get_user_reminder_settings(user_id):
     user = user_col.find_one({"_id": user_id})
-    return user.get("reminder_settings", {
-        "morning_adhkar": True,
-        "evening_adhkar": True,
-        "jumuah": True,
-        "prayer": True
-    })
+    return user.get("reminder_settings", dict(DEFAULT_REMINDER_SETTINGS))
 
 def update_reminder_setting(user_id, key, value: bool):
     user_col.update_one(
         {"_id": user_id},
-        {"$set": {f"reminder_settings.{key}": value}},
+        {"$set": {f"reminder_settings.{key}": value, "reminder_updated_at": datetime.utcnow()}},
         upsert=True
     )
+    _notify_user_changed(user_id)
+
+# ⏰ تحميل بيانات التذكير فقط (بدون المفضلة وباقي الوثيقة)
+REMINDER_FIELDS = {"location": 1, "timezone": 1, "reminder_settings": 1, "notifications_enabled": 1}
+
+def _reminder_user(doc):
+    location = doc.get("location") or {}
+    return {
+        "_id": doc["_id"],
+        "lat": location.get("lat"),
+        "lon": location.get("lon"),
+        "timezone": doc.get("timezone", "auto"),
+        "settings": {**DEFAULT_REMINDER_SETTINGS, **(doc.get("reminder_settings") or {})},
+        "notifications_enabled": doc.get("notifications_enabled", True)
+    }
+
+def get_reminder_user(user_id):
+    doc = user_col.find_one({"_id": user_id}, REMINDER_FIELDS)
+    return _reminder_user(doc) if doc else None
+
+def iter_reminder_users(query=None, batch_size=1000):
+    cursor = user_col.find(query or {}, REMINDER_FIELDS, batch_size=batch_size)
+    for doc in cursor:
+        yield _reminder_user(doc)
+
+# 🌍 تجميع المستخدمين حسب المنطقة الزمنية (يعتمد على فهرس timezone)
+def ensure_reminder_indexes():
+    user_col.create_index("timezone")
+    user_col.create_index("reminder_updated_at")
+
+# المستخدمون الذين عُدّلت بيانات تذكيرهم (لإبلاغ باقي النسخ)
+def iter_reminder_users_changed_since(since):
+    return iter_reminder_users({"reminder_updated_at": {"$gt": since}})
+
+def get_user_timezones():
+    return [z for z in user_col.distinct("timezone") if z and z != "auto"]
+
+def iter_jumuah_user_ids(tz_name, batch_size=1000):
+    cursor = user_col.find(
+        {
+            "timezone": tz_name,
+            "reminder_settings.jumuah": {"$ne": False},
+            "notifications_enabled": {"$ne": False}
+        },
+        {"_id": 1},
+        batch_size=batch_size
+    )
+    for doc in cursor:
+        yield doc["_id"]
 
 # ⭐ المفضلة
 def add_to_fav(user_id, type_, content):
@@ -162,22 +237,21 @@ def get_all_complaints(filter_by=None):
 def update_complaint_status(comp_id, status="closed"):
     comp_col.update_one({"_id": ObjectId(comp_id)}, {"$set": {"status": status}})
 
-def reply_to_complaint(comp_id, reply_text, bot=None):
+# ✅ الرد يُرسل عبر طابور الإرسال دون انتظار، وتُغلق الشكوى عند نجاح الإرسال
+def reply_to_complaint(comp_id, reply_text):
     comp = comp_col.find_one({"_id": ObjectId(comp_id)})
     if not comp:
         return False
-    user_id = comp["user_id"]
-    try:
-        message = f"📩 رد الإدارة على {'الشكوى' if comp['type'] == 'complaint' else 'الاقتراح'}:\n\n{reply_text}"
-        if bot:
-            bot.send_message(user_id, message)
+    message = f"📩 رد الإدارة على {'الشكوى' if comp['type'] == 'complaint' else 'الاقتراح'}:\n\n{reply_text}"
+
+    def done(job):
+        if job.error is None:
+            update_complaint_status(comp_id, "closed")
         else:
-            from loader import bot as default_bot
-            default_bot.send_message(user_id, message)
-        update_complaint_status(comp_id, "closed")
-        return True
-    except:
-        return False
+            print(f"[ERROR] إرسال الرد على الشكوى {comp_id}: {job.error}")
+
+    send("send_message", comp["user_id"], message, on_done=done)
+    return True
 
 # 📊 الإحصائيات
 def get_bot_stats():
@@ -197,12 +271,10 @@ def get_bot_stats():
 def get_all_user_ids():
     return [doc["_id"] for doc in user_col.find({}, {"_id": 1})]
 
+# المستخدمون الذين حظروا البوت لا تُرسل لهم الرسائل الجماعية
 def broadcast_message(bot, message_text):
-    for user_id in get_all_user_ids():
-        try:
-            bot.send_message(user_id, message_text)
-        except:
-            continue
+    for doc in user_col.find({"blocked": {"$ne": True}}, {"_id": 1}):
+        send("send_message", doc["_id"], message_text, priority=PRIORITY_BROADCAST)
 
 # 👤 نظام المشرفين
 def is_admin(user_id_or_username):
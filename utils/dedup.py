@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from utils.db import db
+
+claims_col = db["reminder_claims"]
+
+# 🔒 منع تكرار الإرسال: LRU محدود في الذاكرة أمام مجموعة Mongo بفهرس TTL
+# أول نسخة تُدرج المفتاح هي وحدها التي ترسل
+class DedupStore:
+    def __init__(self, collection, max_size=50000):
+        self.collection = collection
+        self.max_size = max_size
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self):
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def _seen_locally(self, key, now):
+        with self._lock:
+            expires_at = self._local.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= now:
+                del self._local[key]
+                return False
+            self._local.move_to_end(key)
+            return True
+
+    def _remember(self, key, expires_at):
+        with self._lock:
+            self._local[key] = expires_at
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    # ✅ يرجع True مرة واحدة فقط لكل مفتاح خلال مدة ttl عبر كل النسخ
+    def claim(self, key, ttl=timedelta(hours=6)):
+        now = datetime.utcnow()
+        if self._seen_locally(key, now):
+            return False
+
+        expires_at = now + ttl
+        try:
+            self.collection.insert_one({"_id": key, "expires_at": expires_at})
+            claimed = True
+        except DuplicateKeyError:
+            # وثيقة منتهية لم يحذفها مراقب TTL بعد (يعمل كل دقيقة)
+            claimed = self.collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$lte": now}},
+                {"$set": {"expires_at": expires_at}}
+            ) is not None
+
+        self._remember(key, expires_at)
+        return claimed
+
+    def size(self):
+        with self._lock:
+            return len(self._local)
+
+
+reminder_claims = DedupStore(claims_col)
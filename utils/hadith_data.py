@@ -0,0 +1,226 @@
+import hashlib
+import json
+import random
+import threading
+from datetime import datetime
+import requests
+from config import HADITH_API_KEY
+from utils.cache import TTLCache
+from utils.db import db
+
+# 📜 صفحات الأحاديث وقائمة الكتب: من النسخة المحلية (Mongo) أولًا ثم hadithapi.com
+# مع ذاكرة LRU بمدة صلاحية أمامهما
+BASE_URL = "https://www.hadithapi.com/public/api"
+PAGE_TTL = 3600
+MAX_PAGES = 500
+BOOKS_TTL = 24 * 3600
+# كل كتاب له رقم إصدار (sync.version) تزيده المزامنة عند تغيّر صفحة، ويُقرأ مرة كل دقيقة
+# فتنتقل كل نسخ البوت إلى المحتوى الجديد دون إعادة تشغيل (الإصدار جزء من مفاتيح الذاكرة)
+VERSION_CHECK_SECONDS = 60
+
+headers = {
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0"
+}
+
+params_base = {
+    "apiKey": HADITH_API_KEY,
+    "language": "arabic"
+}
+
+books_col = db["hadith_books"]
+pages_col = db["hadith_pages"]
+
+page_cache = TTLCache("hadith_pages", max_size=MAX_PAGES, ttl=PAGE_TTL)
+books_cache = TTLCache("hadith_books", max_size=1, ttl=BOOKS_TTL)
+meta_cache = TTLCache("hadith_meta", max_size=50, ttl=BOOKS_TTL)
+versions_cache = TTLCache("hadith_versions", max_size=50, ttl=VERSION_CHECK_SECONDS)
+
+# 🔔 مستمعون لكل صفحة تُحمّل أو تُحفظ (مثل فهرس البحث)
+_page_listeners = []
+
+
+def on_page_loaded(callback):
+    _page_listeners.append(callback)
+
+
+def _notify_page_loaded(book_slug, page, page_data):
+    for callback in _page_listeners:
+        try:
+            callback(book_slug, int(page), page_data)
+        except Exception as e:
+            print(f"[ERROR] معالجة صفحة الأحاديث {book_slug}:{page}: {e}")
+
+
+def fetch_books():
+    res = requests.get(f"{BASE_URL}/books", params=params_base, headers=headers, timeout=15)
+    res.raise_for_status()
+    return res.json().get("books", [])
+
+
+# ✅ صفحة كاملة: {"data": [...], "per_page", "total", "last_page"}
+def fetch_hadith_page(book_slug, page):
+    res = requests.get(
+        f"{BASE_URL}/hadiths",
+        params={**params_base, "book": book_slug, "page": page},
+        headers=headers,
+        timeout=15
+    )
+    res.raise_for_status()
+    data = res.json().get("hadiths", {})
+    return {
+        "data": data.get("data", []),
+        "per_page": int(data.get("per_page") or 25),
+        "total": int(data.get("total") or 0),
+        "last_page": int(data.get("last_page") or page)
+    }
+
+
+def page_hash(page_data):
+    return hashlib.sha1(json.dumps(page_data["data"], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ✅ حفظ صفحة في النسخة المحلية، ويرجع True إذا كانت جديدة أو تغيّر محتواها
+def save_page(book_slug, page, page_data):
+    key = f"{book_slug}:{int(page)}"
+    digest = page_hash(page_data)
+    if pages_col.find_one({"_id": key, "hash": digest}, {"_id": 1}):
+        return False
+    pages_col.update_one(
+        {"_id": key},
+        {"$set": {"book": book_slug, "page": int(page), **page_data, "hash": digest, "synced_at": datetime.utcnow()}},
+        upsert=True
+    )
+    books_col.update_one({"_id": book_slug}, {"$inc": {"sync.version": 1}}, upsert=True)
+    versions_cache.invalidate(book_slug)
+    _notify_page_loaded(book_slug, page, page_data)
+    return True
+
+
+# 🔔 مستمعون لتغيّر إصدار كتاب (مزامنة من process آخر)، مثل فهرس البحث
+_version_listeners = []
+_known_versions = {}
+_versions_lock = threading.Lock()
+
+
+def on_book_changed(callback):
+    _version_listeners.append(callback)
+
+
+def _record_version(book_slug, version):
+    with _versions_lock:
+        old = _known_versions.get(book_slug)
+        _known_versions[book_slug] = version
+    if old is not None and old != version:
+        for callback in _version_listeners:
+            try:
+                callback(book_slug)
+            except Exception as e:
+                print(f"[ERROR] معالجة تحديث الكتاب {book_slug}: {e}")
+    return version
+
+
+def _load_version(book_slug):
+    doc = books_col.find_one({"_id": book_slug}, {"sync.version": 1}) or {}
+    return _record_version(book_slug, (doc.get("sync") or {}).get("version", 0))
+
+
+# 🔄 إصدارات كل الكتب باستعلام واحد (لمن يتابع كل الكتب وليس المفتوحة فقط)
+def refresh_book_versions():
+    for doc in books_col.find({}, {"sync.version": 1}):
+        version = (doc.get("sync") or {}).get("version", 0)
+        versions_cache.set(doc["_id"], version)
+        _record_version(doc["_id"], version)
+
+
+def book_version(book_slug):
+    return versions_cache.get_or_load(book_slug, lambda: _load_version(book_slug))
+
+
+def _mirrored_page(book_slug, page):
+    doc = pages_col.find_one({"_id": f"{book_slug}:{int(page)}"})
+    if not doc:
+        return None
+    return {key: doc[key] for key in ("data", "per_page", "total", "last_page")}
+
+
+def _load_books():
+    books = list(books_col.find({}, {"_id": 0, "sync": 0}).sort("order", 1))
+    return books or fetch_books()
+
+
+def _load_page(book_slug, page):
+    page_data = _mirrored_page(book_slug, page) or fetch_hadith_page(book_slug, page)
+    _notify_page_loaded(book_slug, page, page_data)
+    return page_data
+
+
+def iter_mirrored_pages(book_slug=None, since=None):
+    query = {}
+    if book_slug:
+        query["book"] = book_slug
+    if since:
+        query["synced_at"] = {"$gt": since}
+    for doc in pages_col.find(query, {"book": 1, "page": 1, "data": 1}):
+        yield doc["book"], doc["page"], {"data": doc.get("data", [])}
+
+
+def get_books():
+    return books_cache.get_or_load("books", _load_books)
+
+
+def get_hadith_page(book_slug, page):
+    key = (book_slug, int(page), book_version(book_slug))
+    return page_cache.get_or_load(key, lambda: _load_page(book_slug, page))
+
+
+# 🗂️ بيانات الكتاب: العدد الكلي وحجم الصفحة، وفهرس رقم الحديث -> (الصفحة، الموضع) من النسخة المحلية
+def _build_book_meta(book_slug):
+    first = get_hadith_page(book_slug, 1)
+    numbers = {}
+    for doc in pages_col.find({"book": book_slug}, {"page": 1, "data.hadithNumber": 1}):
+        for index, hadith in enumerate(doc.get("data", [])):
+            numbers.setdefault(str(hadith.get("hadithNumber")), (doc["page"], index))
+    return {
+        "total": first["total"] or len(first["data"]),
+        "per_page": first["per_page"],
+        "last_page": first["last_page"],
+        "numbers": numbers
+    }
+
+
+def get_book_meta(book_slug):
+    key = (book_slug, book_version(book_slug))
+    return meta_cache.get_or_load(key, lambda: _build_book_meta(book_slug))
+
+
+# ✅ موضع الحديث برقمه: من الفهرس مباشرة، وإلا (كتاب غير مُزامن) من الصفحة المتوقعة مع التحقق
+def locate_hadith(book_slug, number):
+    meta = get_book_meta(book_slug)
+    position = meta["numbers"].get(str(number).strip())
+    if position:
+        return position
+    try:
+        guess = int(number) - 1
+    except ValueError:
+        return None
+    if guess < 0:
+        return None
+    page = guess // meta["per_page"] + 1
+    for index, hadith in enumerate(get_hadith_page(book_slug, page)["data"]):
+        if str(hadith.get("hadithNumber")) == str(number).strip():
+            return page, index
+    return None
+
+
+# 🎲 موضع عشوائي بتوزيع متساوٍ على كل أحاديث الكتاب
+def random_position(book_slug):
+    meta = get_book_meta(book_slug)
+    if not meta["total"]:
+        return None
+    position = random.randrange(meta["total"])
+    return position // meta["per_page"] + 1, position % meta["per_page"]
+
+
+def hadith_cache_stats():
+    return [page_cache.stats(), books_cache.stats(), meta_cache.stats(), versions_cache.stats()]
@@ -0,0 +1,140 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.arabic import normalize
+from utils.search_index import InvertedIndex
+from utils.hadith_data import (
+    VERSION_CHECK_SECONDS,
+    on_page_loaded,
+    on_book_changed,
+    refresh_book_versions,
+    iter_mirrored_pages,
+    get_hadith_page
+)
+
+# 🔍 البحث في نصوص الأحاديث (كل الكتب) عبر فهرس مقلوب يُحدَّث مع كل صفحة تُحمّل
+# معرّف الوثيقة: "book:page:index"
+PAGE_SIZE = 5
+# بداية النص العربي تحوي غالبًا السند، فنبحث فيها عن اسم الراوي
+ISNAD_CHARS = 300
+
+# هامش لفرق الساعة بين هذا الـ process وأداة المزامنة عند اختيار الصفحات المتغيرة (synced_at)
+CLOCK_MARGIN = timedelta(minutes=5)
+
+_index = InvertedIndex()
+_docs = {}
+_lock = threading.Lock()
+# آخر وقت فُهرست فيه صفحات كل كتاب من النسخة المحلية
+_indexed_at = {}
+_warmed_at = None
+
+
+def index_page(book_slug, page, page_data):
+    for index, hadith in enumerate(page_data.get("data", [])):
+        doc_id = f"{book_slug}:{page}:{index}"
+        text = hadith.get("hadithArabic") or ""
+        if not text:
+            continue
+        _index.add_document(doc_id, text)
+        narrator = normalize(f"{hadith.get('englishNarrator') or ''} {text[:ISNAD_CHARS]}")
+        with _lock:
+            _docs[doc_id] = (book_slug, " ".join(narrator.split()))
+
+    # الصفحة صارت أقصر بعد المزامنة: حذف الأحاديث التي لم تعد فيها
+    index = len(page_data.get("data", []))
+    while f"{book_slug}:{page}:{index}" in _docs:
+        doc_id = f"{book_slug}:{page}:{index}"
+        _index.remove_document(doc_id)
+        with _lock:
+            _docs.pop(doc_id, None)
+        index += 1
+
+
+on_page_loaded(index_page)
+
+
+# 🔄 كتاب تغيّر إصداره (مزامنة من process آخر): إعادة فهرسة صفحاته المتغيرة فقط
+def reindex_book(book_slug):
+    started = datetime.utcnow()
+    since = _indexed_at.get(book_slug) or _warmed_at
+    count = 0
+    for _, page, page_data in iter_mirrored_pages(book_slug, since=since - CLOCK_MARGIN if since else None):
+        index_page(book_slug, page, page_data)
+        count += 1
+    _indexed_at[book_slug] = started
+    print(f"🔄 فهرس البحث: أعيدت فهرسة {count} صفحة من {book_slug}")
+
+
+# التغيير قد يُكتشف أثناء طلب مستخدم (book_version)، فتعاد الفهرسة في الخلفية ومرة واحدة لكل كتاب
+_reindexing = set()
+
+
+def _schedule_reindex(book_slug):
+    with _lock:
+        if book_slug in _reindexing:
+            return
+        _reindexing.add(book_slug)
+
+    def run():
+        try:
+            reindex_book(book_slug)
+        except Exception as e:
+            print(f"[ERROR] إعادة فهرسة {book_slug}: {e}")
+        finally:
+            with _lock:
+                _reindexing.discard(book_slug)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+on_book_changed(_schedule_reindex)
+
+
+# ✅ عند التشغيل: فهرسة كل الصفحات المحفوظة في النسخة المحلية (في الخلفية)
+def warm_hadith_index():
+    def run():
+        global _warmed_at
+        try:
+            started = time.monotonic()
+            # الإصدارات الحالية أولًا حتى يُلتقط أي تغيير يحدث أثناء البناء
+            _warmed_at = datetime.utcnow()
+            refresh_book_versions()
+            for book_slug, page, page_data in iter_mirrored_pages():
+                index_page(book_slug, page, page_data)
+            print(f"✅ فهرس البحث في الأحاديث: {len(_index)} حديث في {time.monotonic() - started:.1f} ث")
+        except Exception as e:
+            print(f"[ERROR] بناء فهرس البحث في الأحاديث: {e}")
+
+        # متابعة إصدارات الكتب: أي مزامنة جديدة تُفهرس دون إعادة بناء كاملة
+        while True:
+            time.sleep(VERSION_CHECK_SECONDS)
+            try:
+                refresh_book_versions()
+            except Exception as e:
+                print(f"[ERROR] متابعة تحديثات الأحاديث: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def indexed_count():
+    return len(_index)
+
+
+# ✅ نتائج صفحة واحدة مع فلتر اختياري بالكتاب و/أو الراوي
+def search_hadith(query, book_slug=None, narrator=None, page=0, page_size=PAGE_SIZE):
+    narrator = " ".join(normalize(narrator).split()) if narrator else None
+
+    def matches(doc_id):
+        book, narrator_key = _docs.get(doc_id, (None, ""))
+        if book_slug and book != book_slug:
+            return False
+        return not narrator or narrator in narrator_key
+
+    hits, total = _index.search(query, offset=page * page_size, limit=page_size, doc_filter=matches)
+    results = []
+    for doc_id, _ in hits:
+        book, hadith_page, index = doc_id.rsplit(":", 2)
+        hadiths = get_hadith_page(book, int(hadith_page))["data"]
+        if int(index) < len(hadiths):
+            results.append({"book": book, "page": int(hadith_page), "index": int(index), "hadith": hadiths[int(index)]})
+    return results, total
@@ -1,7 +1,9 @@
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-from config import OWNER_ID
+from utils.db import is_admin
 
-def show_main_menu(bot, message):
+MAIN_MENU_TEXT = "🌙 مرحبًا بك في البوت الإسلامي!\nاختر أحد الخيارات:"
+
+def main_menu_markup(user_id):
     markup = InlineKeyboardMarkup(row_width=2)
     markup.add(
         InlineKeyboardButton("🕌 أوقات الصلاة", callback_data="menu:prayer"),
@@ -12,12 +14,14 @@ def show_main_menu(bot, message):
         InlineKeyboardButton("📝 الشكاوى", callback_data="menu:complain"),
         InlineKeyboardButton("⚙️ الإعدادات", callback_data="menu:settings")
     )
-    if message.chat.id == OWNER_ID:
+    if is_admin(user_id):
         markup.add(InlineKeyboardButton("🧑‍💼 المشرف", callback_data="menu:admin"))
+    return markup
 
+def show_main_menu(bot, message):
     bot.edit_message_text(
-        "🌙 مرحبًا بك في البوت الإسلامي!\nاختر أحد الخيارات:",
+        MAIN_MENU_TEXT,
         message.chat.id,
         message.message_id,
-        reply_markup=markup
+        reply_markup=main_menu_markup(message.chat.id)
     )
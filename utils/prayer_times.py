@@ -0,0 +1,230 @@
+from datetime import datetime, date as date_cls
+from math import sin, cos, tan, asin, acos, atan, atan2, degrees, radians, floor, copysign
+from pytz import timezone as tz, utc, FixedOffset, UnknownTimeZoneError
+
+# ✅ طرق الحساب بنفس ترقيم aladhan (معامل method)
+# القيمة الرقمية = زاوية انخفاض الشمس، والنص "90 min" = دقائق بعد المغرب
+METHODS = {
+    0: {"name": "Shia Ithna-Ansari", "fajr": 16, "isha": 14, "maghrib": 4, "midnight": "jafari"},
+    1: {"name": "University of Islamic Sciences, Karachi", "fajr": 18, "isha": 18},
+    2: {"name": "Islamic Society of North America", "fajr": 15, "isha": 15},
+    3: {"name": "Muslim World League", "fajr": 18, "isha": 17},
+    4: {"name": "Umm Al-Qura University, Makkah", "fajr": 18.5, "isha": "90 min"},
+    5: {"name": "Egyptian General Authority of Survey", "fajr": 19.5, "isha": 17.5},
+    7: {"name": "Institute of Geophysics, University of Tehran", "fajr": 17.7, "isha": 14, "maghrib": 4.5, "midnight": "jafari"},
+    8: {"name": "Gulf Region", "fajr": 19.5, "isha": "90 min"},
+    9: {"name": "Kuwait", "fajr": 18, "isha": 17.5},
+    10: {"name": "Qatar", "fajr": 18, "isha": "90 min"},
+    11: {"name": "Majlis Ugama Islam Singapura", "fajr": 20, "isha": 18},
+    12: {"name": "Union Organization islamic de France", "fajr": 12, "isha": 12},
+    13: {"name": "Diyanet İşleri Başkanlığı, Turkey", "fajr": 18, "isha": 17},
+    14: {"name": "Spiritual Administration of Muslims of Russia", "fajr": 16, "isha": 15},
+    16: {"name": "Dubai", "fajr": 18.2, "isha": 18.2},
+    17: {"name": "Jabatan Kemajuan Islam Malaysia (JAKIM)", "fajr": 20, "isha": 18},
+    18: {"name": "Tunisia", "fajr": 18, "isha": 18},
+    19: {"name": "Algeria", "fajr": 18, "isha": 17},
+    20: {"name": "KEMENAG - Kementerian Agama Republik Indonesia", "fajr": 20, "isha": 18},
+    21: {"name": "Morocco", "fajr": 19, "isha": 17},
+}
+
+DEFAULT_METHOD = 4
+
+# 0 = شافعي (الافتراضي في aladhan)، 1 = حنفي
+ASR_FACTORS = {0: 1, 1: 2}
+
+TIMING_KEYS = ["Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha"]
+
+# تقديرات البداية وعدد التكرارات كما في PrayTimes (numIterations = 1)
+INITIAL_TIMES = {"Fajr": 5, "Sunrise": 6, "Dhuhr": 12, "Asr": 13, "Sunset": 18, "Maghrib": 18, "Isha": 18}
+ITERATIONS = 1
+
+# 🌍 عند عدم شروق الشمس أو غروبها (النهار/الليل القطبي) نأخذ الأوقات من أقرب خط عرض تشرق فيه وتغرب
+POLAR_LAT = 65.0
+
+
+def _fix(a, b):
+    a = a - b * floor(a / b)
+    return a + b if a < 0 else a
+
+
+def _fix_hour(h):
+    return _fix(h, 24.0)
+
+
+def _julian(year, month, day):
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = floor(year / 100)
+    b = 2 - a + floor(a / 4)
+    return floor(365.25 * (year + 4716)) + floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+# ☀️ ميل الشمس ومعادلة الزمن لليوم اليولياني
+def _sun_position(jd):
+    d = jd - 2451545.0
+    g = _fix(357.529 + 0.98560028 * d, 360)
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    l = _fix(q + 1.915 * sin(radians(g)) + 0.020 * sin(radians(2 * g)), 360)
+    e = 23.439 - 0.00000036 * d
+
+    ra = degrees(atan2(cos(radians(e)) * sin(radians(l)), cos(radians(l)))) / 15
+    eqt = q / 15 - _fix_hour(ra)
+    decl = degrees(asin(sin(radians(e)) * sin(radians(l))))
+    return decl, eqt
+
+
+class _Calculator:
+    def __init__(self, lat, lon, day, params, asr_factor):
+        self.lat = lat
+        self.lon = lon
+        self.params = params
+        self.asr_factor = asr_factor
+        self.jdate = _julian(day.year, day.month, day.day) - lon / (15 * 24.0)
+
+    def mid_day(self, t):
+        _, eqt = _sun_position(self.jdate + t)
+        return _fix_hour(12 - eqt)
+
+    def sun_angle_time(self, angle, t, ccw=False):
+        decl, _ = _sun_position(self.jdate + t)
+        noon = self.mid_day(t)
+        cos_h = (-sin(radians(angle)) - sin(radians(decl)) * sin(radians(self.lat))) / (
+            cos(radians(decl)) * cos(radians(self.lat))
+        )
+        if cos_h < -1 or cos_h > 1:
+            return None
+        h = degrees(acos(cos_h)) / 15.0
+        return noon - h if ccw else noon + h
+
+    def asr_time(self, t):
+        decl, _ = _sun_position(self.jdate + t)
+        angle = -degrees(atan(1 / (self.asr_factor + tan(radians(abs(self.lat - decl))))))
+        return self.sun_angle_time(angle, t)
+
+    def _compute_once(self, estimates):
+        p = {k: v / 24.0 for k, v in estimates.items()}
+        params = self.params
+
+        maghrib_angle = params.get("maghrib", 0)
+        return {
+            "Fajr": self.sun_angle_time(params["fajr"], p["Fajr"], ccw=True),
+            "Sunrise": self.sun_angle_time(0.833, p["Sunrise"], ccw=True),
+            "Dhuhr": self.mid_day(p["Dhuhr"]),
+            "Asr": self.asr_time(p["Asr"]),
+            "Sunset": self.sun_angle_time(0.833, p["Sunset"]),
+            "Maghrib": self.sun_angle_time(maghrib_angle, p["Maghrib"]) if isinstance(maghrib_angle, (int, float)) and maghrib_angle else None,
+            "Isha": self.sun_angle_time(params["isha"], p["Isha"]) if not isinstance(params["isha"], str) else None,
+        }
+
+    # كل تكرار يبدأ من نتائج السابق (والوقت غير الموجود يبقى على تقديره المبدئي)
+    def compute(self, iterations=ITERATIONS):
+        times = dict(INITIAL_TIMES)
+        for _ in range(iterations):
+            estimates = {k: INITIAL_TIMES[k] if times[k] is None else times[k] for k in INITIAL_TIMES}
+            times = self._compute_once(estimates)
+        return times
+
+
+def _minutes(value):
+    return float(str(value).split()[0])
+
+
+# 🌍 معالجة خطوط العرض العليا (ANGLE_BASED وهو الافتراضي في aladhan)
+# الشروق والغروب موجودان دائمًا هنا بعد استبدال أوقات النهار/الليل القطبي
+def _adjust_high_lats(times, params):
+    sunrise, sunset = times["Sunrise"], times["Sunset"]
+    if sunrise is None or sunset is None:
+        return times
+    night = _fix_hour(sunrise - sunset)
+
+    portion = params["fajr"] / 60.0 * night
+    fajr = times["Fajr"]
+    if fajr is None or _fix_hour(sunrise - fajr) > portion:
+        times["Fajr"] = sunrise - portion
+
+    if not isinstance(params["isha"], str):
+        portion = params["isha"] / 60.0 * night
+        isha = times["Isha"]
+        if isha is None or _fix_hour(isha - sunset) > portion:
+            times["Isha"] = sunset + portion
+
+    maghrib_angle = params.get("maghrib")
+    if isinstance(maghrib_angle, (int, float)) and maghrib_angle:
+        portion = maghrib_angle / 60.0 * night
+        maghrib = times["Maghrib"]
+        if maghrib is None or _fix_hour(maghrib - sunset) > portion:
+            times["Maghrib"] = sunset + portion
+    return times
+
+
+# ✅ حساب الأوقات بالساعات العشرية حسب إزاحة التوقيت المحلي
+def calculate_times(lat, lon, day, utc_offset, method=DEFAULT_METHOD, school=0):
+    params = METHODS.get(method, METHODS[DEFAULT_METHOD])
+    asr_factor = ASR_FACTORS.get(school, 1)
+    times = _Calculator(lat, lon, day, params, asr_factor).compute()
+    if times["Sunrise"] is None or times["Sunset"] is None:
+        nearest = _Calculator(copysign(POLAR_LAT, lat), lon, day, params, asr_factor).compute()
+        times = dict(nearest, Dhuhr=times["Dhuhr"])
+
+    shift = utc_offset - lon / 15.0
+    times = {k: (v + shift if v is not None else None) for k, v in times.items()}
+    times = _adjust_high_lats(times, params)
+
+    if times["Maghrib"] is None:
+        times["Maghrib"] = times["Sunset"]
+    if isinstance(params["isha"], str):
+        maghrib = times["Maghrib"]
+        times["Isha"] = maghrib + _minutes(params["isha"]) / 60.0 if maghrib is not None else None
+    return times
+
+
+def format_time(hours):
+    if hours is None:
+        return "--:--"
+    hours = _fix_hour(hours + 0.5 / 60)
+    h = int(floor(hours))
+    m = int(floor((hours - h) * 60))
+    return f"{h:02d}:{m:02d}"
+
+
+# 🕰️ تحويل اسم المنطقة الزمنية إلى tzinfo، مع تقدير من خط الطول عند "auto"
+def resolve_timezone(tz_name, lon=None):
+    if tz_name and tz_name != "auto":
+        try:
+            return tz(tz_name)
+        except UnknownTimeZoneError:
+            pass
+    if lon is None:
+        return utc
+    return FixedOffset(int(round(lon / 15.0)) * 60)
+
+
+def localize(user_tz, naive):
+    if hasattr(user_tz, "localize"):
+        return user_tz.localize(naive)
+    return naive.replace(tzinfo=user_tz)
+
+
+def utc_offset_hours(user_tz, day):
+    noon = localize(user_tz, datetime(day.year, day.month, day.day, 12))
+    return noon.utcoffset().total_seconds() / 3600.0
+
+
+# ✅ أوقات اليوم بصيغة aladhan ("HH:MM" بالتوقيت المحلي)
+def get_timings(lat, lon, day=None, tz_name=None, method=DEFAULT_METHOD, school=0):
+    user_tz = resolve_timezone(tz_name, lon)
+    if day is None:
+        day = datetime.now(utc).astimezone(user_tz).date()
+    elif isinstance(day, datetime):
+        day = day.date()
+
+    times = calculate_times(float(lat), float(lon), day, utc_offset_hours(user_tz, day), method, school)
+    timings = {key: format_time(times[key]) for key in TIMING_KEYS}
+    return timings
+
+
+def readable_date(day):
+    if not isinstance(day, date_cls):
+        day = datetime.now(utc).date()
+    return day.strftime("%d %b %Y")
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ⚡ تحميل مسبق للعنصر التالي في الخلفية (الآية/الحديث التالي) حتى يكون جاهزًا عند الضغط
+# عدد خيوط محدود، وحد لكل مستخدم، وطابور محدود حتى لا يؤثر على الطلبات الفعلية
+MAX_WORKERS = 4
+PER_USER = 2
+MAX_PENDING = 64
+
+
+class Prefetcher:
+    def __init__(self, max_workers=MAX_WORKERS, per_user=PER_USER, max_pending=MAX_PENDING):
+        self.per_user = per_user
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._keys = set()
+        self._users = {}
+        self.stats = {"scheduled": 0, "skipped": 0, "failed": 0}
+
+    # ✅ جدولة تحميل مسبق؛ يُتجاهل إذا كان المفتاح قيد التحميل أو تجاوز المستخدم حده
+    def schedule(self, user_id, key, fn, *args):
+        with self._lock:
+            if (
+                key in self._keys
+                or self._users.get(user_id, 0) >= self.per_user
+                or len(self._keys) >= self.max_pending
+            ):
+                self.stats["skipped"] += 1
+                return False
+            self._keys.add(key)
+            self._users[user_id] = self._users.get(user_id, 0) + 1
+            self.stats["scheduled"] += 1
+        self._pool.submit(self._run, user_id, key, fn, args)
+        return True
+
+    def _run(self, user_id, key, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            with self._lock:
+                self.stats["failed"] += 1
+            print(f"[ERROR] تحميل مسبق {key}: {e}")
+        finally:
+            with self._lock:
+                self._keys.discard(key)
+                left = self._users.get(user_id, 1) - 1
+                if left > 0:
+                    self._users[user_id] = left
+                else:
+                    self._users.pop(user_id, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._keys)
+
+
+prefetcher = Prefetcher()
@@ -0,0 +1,130 @@
+import os
+import random
+import sqlite3
+import threading
+
+# 📖 نسخة محلية من القرآن (6236 آية) في SQLite، تُحمّل في الذاكرة عند أول استخدام
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "quran.sqlite")
+TOTAL_AYAHS = 6236
+AUDIO_BASE = "https://cdn.islamic.network/quran/audio"
+
+_lock = threading.Lock()
+_surahs = []
+_ayahs = []
+_juz_ranges = {}
+
+
+class CorpusUnavailable(Exception):
+    pass
+
+
+def corpus_exists():
+    return os.path.exists(CORPUS_PATH)
+
+
+def _load():
+    if not corpus_exists():
+        raise CorpusUnavailable("ملف القرآن المحلي غير موجود، شغّل: python -m tasks.build_quran_corpus")
+    conn = sqlite3.connect(CORPUS_PATH)
+    try:
+        surahs = [
+            {
+                "number": row[0],
+                "name": row[1],
+                "englishName": row[2],
+                "englishNameTranslation": row[3],
+                "revelationType": row[4],
+                "numberOfAyahs": row[5],
+                "firstAyah": row[6]
+            }
+            for row in conn.execute(
+                "SELECT number, name, english_name, english_translation, revelation_type, ayah_count, first_ayah "
+                "FROM surahs ORDER BY number"
+            )
+        ]
+        ayahs = [
+            {"number": row[0], "surah": row[1], "numberInSurah": row[2], "text": row[3], "juz": row[4], "page": row[5]}
+            for row in conn.execute("SELECT number, surah, ayah, text, juz, page FROM ayahs ORDER BY number")
+        ]
+    finally:
+        conn.close()
+    return surahs, ayahs, _build_juz_ranges(ayahs)
+
+
+# الأجزاء متصلة في الترقيم العام: جزء -> (أول آية، آخر آية)
+def _build_juz_ranges(ayahs):
+    ranges = {}
+    for ayah in ayahs:
+        first, _ = ranges.get(ayah["juz"], (ayah["number"], ayah["number"]))
+        ranges[ayah["juz"]] = (first, ayah["number"])
+    return ranges
+
+
+def _ensure_loaded():
+    global _surahs, _ayahs, _juz_ranges
+    if _ayahs:
+        return
+    with _lock:
+        if not _ayahs:
+            _surahs, _ayahs, _juz_ranges = _load()
+
+
+def reload():
+    global _surahs, _ayahs, _juz_ranges
+    surahs, ayahs, juz_ranges = _load()
+    with _lock:
+        _surahs, _ayahs, _juz_ranges = surahs, ayahs, juz_ranges
+
+
+# ✅ معلومات السورة (1-114)
+def get_surah(surah_num):
+    _ensure_loaded()
+    surah_num = int(surah_num)
+    if not 1 <= surah_num <= len(_surahs):
+        return None
+    return _surahs[surah_num - 1]
+
+
+# ✅ الآية برقمها العام (1-6236)
+def get_ayah_by_number(number):
+    _ensure_loaded()
+    number = int(number)
+    if not 1 <= number <= len(_ayahs):
+        return None
+    return _ayahs[number - 1]
+
+
+# ✅ الآية برقم السورة ورقمها داخل السورة
+def get_ayah(surah_num, ayah_num):
+    surah = get_surah(surah_num)
+    ayah_num = int(ayah_num)
+    if not surah or not 1 <= ayah_num <= surah["numberOfAyahs"]:
+        return None
+    return _ayahs[surah["firstAyah"] + ayah_num - 2]
+
+
+# 🎲 آية عشوائية بتوزيع متساوٍ على كل الآيات (أو داخل جزء / نطاق سور)
+def random_ayah(juz=None, surah_from=None, surah_to=None):
+    _ensure_loaded()
+    if juz is not None:
+        if int(juz) not in _juz_ranges:
+            return None
+        first, last = _juz_ranges[int(juz)]
+    elif surah_from is not None:
+        start, end = get_surah(surah_from), get_surah(surah_to if surah_to is not None else surah_from)
+        if not start or not end or start["number"] > end["number"]:
+            return None
+        first, last = start["firstAyah"], end["firstAyah"] + end["numberOfAyahs"] - 1
+    else:
+        first, last = 1, len(_ayahs)
+    return _ayahs[random.randint(first, last) - 1]
+
+
+def ayah_count():
+    _ensure_loaded()
+    return len(_ayahs)
+
+
+# 🎧 رابط التلاوة يُحسب من رقم الآية العام بدون استدعاء API
+def audio_url(number, edition="ar.alafasy", bitrate=128):
+    return f"{AUDIO_BASE}/{bitrate}/{edition}/{number}.mp3"
@@ -0,0 +1,53 @@
+import threading
+import time
+from utils.search_index import InvertedIndex
+from utils.quran_corpus import corpus_exists, ayah_count, get_ayah_by_number, get_surah
+
+# 🔍 البحث في نص القرآن (بدون تشكيل) عبر فهرس مقلوب يُبنى في الذاكرة من الملف المحلي
+PAGE_SIZE = 5
+
+_index = None
+_lock = threading.Lock()
+
+
+def build_quran_index():
+    index = InvertedIndex()
+    for number in range(1, ayah_count() + 1):
+        index.add_document(number, get_ayah_by_number(number)["text"])
+    return index
+
+
+def get_quran_index():
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                started = time.monotonic()
+                _index = build_quran_index()
+                print(f"✅ فهرس البحث في القرآن: {len(_index)} آية في {time.monotonic() - started:.2f} ث")
+    return _index
+
+
+# ✅ عند التشغيل: بناء الفهرس في الخلفية حتى لا ينتظر أول مستخدم
+def warm_quran_index():
+    if not corpus_exists():
+        # سيُبنى عند أول بحث بعد تجهيز ملف القرآن
+        return
+
+    def run():
+        try:
+            get_quran_index()
+        except Exception as e:
+            print(f"[ERROR] بناء فهرس البحث في القرآن: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+# ✅ نتائج صفحة واحدة: (قائمة الآيات مع السورة، العدد الكلي)
+def search_quran(query, page=0, page_size=PAGE_SIZE):
+    hits, total = get_quran_index().search(query, offset=page * page_size, limit=page_size)
+    results = []
+    for number, _ in hits:
+        ayah = get_ayah_by_number(number)
+        results.append({"ayah": ayah, "surah": get_surah(ayah["surah"])})
+    return results, total
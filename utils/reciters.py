@@ -0,0 +1,31 @@
+from utils.quran_corpus import audio_url
+
+# 🎧 القرّاء المتاحون (معرّف النسخة في cdn.islamic.network، الاسم، جودة الملفات)
+RECITERS = {
+    "ar.alafasy": {"name": "مشاري العفاسي", "bitrate": 128},
+    "ar.abdulbasitmurattal": {"name": "عبد الباسط عبد الصمد (مرتل)", "bitrate": 192},
+    "ar.abdurrahmaansudais": {"name": "عبد الرحمن السديس", "bitrate": 192},
+    "ar.husary": {"name": "محمود خليل الحصري", "bitrate": 128},
+    "ar.minshawi": {"name": "محمد صديق المنشاوي", "bitrate": 128},
+    "ar.mahermuaiqly": {"name": "ماهر المعيقلي", "bitrate": 128},
+    "ar.saoodshuraym": {"name": "سعود الشريم", "bitrate": 128},
+    "ar.hudhaify": {"name": "علي الحذيفي", "bitrate": 128},
+    "ar.shaatree": {"name": "أبو بكر الشاطري", "bitrate": 128},
+    "ar.ahmedajamy": {"name": "أحمد العجمي", "bitrate": 128}
+}
+DEFAULT_RECITER = "ar.alafasy"
+
+
+# قيمة غير معروفة (قديمة أو محذوفة) ترجع للقارئ الافتراضي
+def resolve_reciter(reciter):
+    return reciter if reciter in RECITERS else DEFAULT_RECITER
+
+
+def reciter_name(reciter):
+    return RECITERS[resolve_reciter(reciter)]["name"]
+
+
+# ✅ رابط تلاوة الآية من رقمها العام ونسخة القارئ بدون أي استدعاء API
+def reciter_audio_url(reciter, number):
+    reciter = resolve_reciter(reciter)
+    return audio_url(number, edition=reciter, bitrate=RECITERS[reciter]["bitrate"])
@@ -0,0 +1,44 @@
+import threading
+import time
+from utils.cache import TTLCache
+
+_caches = []
+_lock = threading.Lock()
+
+
+# 🖼️ بطاقات جاهزة (النص + لوحة الأزرار بصيغة JSON) للمحتوى الثابت
+# كل ضغطة متكررة على نفس العنصر = قراءة واحدة من الذاكرة + استدعاء API واحد
+class RenderCache:
+    def __init__(self, name, max_size=20000, ttl=24 * 3600):
+        self.name = name
+        self._cache = TTLCache(name, max_size=max_size, ttl=ttl)
+        self._renders = 0
+        self._render_seconds = 0.0
+        with _lock:
+            _caches.append(self)
+
+    # ✅ render() يرجع (النص، InlineKeyboardMarkup)، ويُستدعى مرة واحدة لكل مفتاح
+    def get(self, key, render):
+        def build():
+            started = time.perf_counter()
+            text, markup = render()
+            card = (text, markup.to_json() if markup is not None else None)
+            with _lock:
+                self._renders += 1
+                self._render_seconds += time.perf_counter() - started
+            return card
+
+        return self._cache.get_or_load(key, build)
+
+    def stats(self):
+        stats = self._cache.stats()
+        with _lock:
+            stats["renders"] = self._renders
+            stats["avg_render_ms"] = (self._render_seconds / self._renders * 1000) if self._renders else 0.0
+        return stats
+
+
+def render_stats():
+    with _lock:
+        caches = list(_caches)
+    return [cache.stats() for cache in caches]
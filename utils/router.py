@@ -0,0 +1,60 @@
+# 🧭 توجيه أزرار callback عبر قاموس: "namespace:arg1:arg2" -> دالة واحدة
+# بدل أن يختبر telebot كل الدوال المسجلة واحدة تلو الأخرى مع كل ضغطة
+MAX_CALLBACK_BYTES = 64
+
+
+# ✅ بناء callback_data مع التأكد من حد تيليجرام (64 بايت)
+def callback_data(namespace, *args):
+    data = ":".join([namespace, *map(str, args)])
+    if len(data.encode("utf-8")) > MAX_CALLBACK_BYTES:
+        raise ValueError(f"callback_data أطول من {MAX_CALLBACK_BYTES} بايت: {data}")
+    return data
+
+
+class CallbackRouter:
+    def __init__(self):
+        self._routes = {}
+        self.stats = {"dispatched": 0, "unmatched": 0}
+
+    def route(self, *namespaces):
+        def decorator(handler):
+            for namespace in namespaces:
+                if namespace in self._routes:
+                    raise ValueError(f"callback مسجل مسبقًا: {namespace}")
+                self._routes[namespace] = handler
+            return handler
+        return decorator
+
+    # أولًا "namespace:action" (مثل settings:toggle) ثم "namespace"
+    # و"nav_2_255" (صيغة قديمة بالشرطة السفلية) تُقرأ كـ nav مع الوسائط 2 و 255
+    def parse(self, data):
+        parts = data.split(":")
+        if len(parts) > 1 and f"{parts[0]}:{parts[1]}" in self._routes:
+            return f"{parts[0]}:{parts[1]}", parts[2:]
+        if parts[0] in self._routes:
+            return parts[0], parts[1:]
+        namespace, _, rest = data.partition("_")
+        if namespace in self._routes:
+            return namespace, rest.split("_") if rest else []
+        return None, []
+
+    def resolve(self, data):
+        namespace, args = self.parse(data or "")
+        return self._routes.get(namespace), args
+
+    # ✅ المعالج يستقبل الوسائط المقروءة: handler(call, *args)
+    def dispatch(self, bot, call):
+        handler, args = self.resolve(call.data)
+        if handler is None:
+            self.stats["unmatched"] += 1
+            bot.answer_callback_query(call.id)
+            return
+        self.stats["dispatched"] += 1
+        handler(call, *args)
+
+    # معالج telebot واحد لكل الأزرار
+    def install(self, bot):
+        bot.callback_query_handler(func=lambda call: True)(lambda call: self.dispatch(bot, call))
+
+
+router = CallbackRouter()
@@ -0,0 +1,101 @@
+import heapq
+import math
+import re
+import threading
+from utils.arabic import tokenize, tokenize_variants
+
+# 🔍 فهرس مقلوب بمواضع الكلمات (للبحث بالعبارة) وترتيب BM25
+K1 = 1.2
+B = 0.75
+_PHRASE = re.compile(r'"([^"]+)"')
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings = {}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def remove_document(self, doc_id):
+        with self._lock:
+            terms = self.doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                docs = self.postings.get(term)
+                if docs:
+                    docs.pop(doc_id, None)
+                    if not docs:
+                        del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    # ✅ إضافة وثيقة (أو استبدالها إن كانت موجودة) دون إعادة بناء الفهرس
+    def add_document(self, doc_id, text):
+        tokens = tokenize_variants(text)
+        positions = {}
+        for pos, forms in enumerate(tokens):
+            for token in forms:
+                positions.setdefault(token, []).append(pos)
+        with self._lock:
+            if doc_id in self.doc_terms:
+                self.remove_document(doc_id)
+            for term, pos_list in positions.items():
+                self.postings.setdefault(term, {})[doc_id] = pos_list
+            self.doc_terms[doc_id] = tuple(positions)
+            self.doc_lengths[doc_id] = len(tokens)
+            self.total_length += len(tokens)
+
+    def _phrase_match(self, terms, doc_id):
+        first = self.postings[terms[0]][doc_id]
+        others = [set(self.postings[t][doc_id]) for t in terms[1:]]
+        return any(all(start + i + 1 in others[i] for i in range(len(others))) for start in first)
+
+    def _idf(self, term, n_docs):
+        df = len(self.postings[term])
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _score(self, weights, doc_id, avg_len):
+        norm = K1 * (1 - B + B * self.doc_lengths[doc_id] / avg_len)
+        score = 0.0
+        for docs, idf in weights:
+            tf = len(docs[doc_id])
+            score += idf * tf * (K1 + 1) / (tf + norm)
+        return score
+
+    # ✅ بحث: الكلمات كلها مطلوبة، والنص بين علامتي تنصيص يجب أن يأتي متتاليًا
+    def search(self, query, offset=0, limit=10, doc_filter=None):
+        phrases = [tokenize(p) for p in _PHRASE.findall(query)]
+        phrases = [p for p in phrases if p]
+        terms = list(dict.fromkeys(tokenize(_PHRASE.sub(" ", query)) + [t for p in phrases for t in p]))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            if any(t not in self.postings for t in terms):
+                return [], 0
+            ordered = sorted(terms, key=lambda t: len(self.postings[t]))
+            candidates = set(self.postings[ordered[0]])
+            for term in ordered[1:]:
+                candidates &= self.postings[term].keys()
+                if not candidates:
+                    return [], 0
+
+            if phrases:
+                candidates = {d for d in candidates if all(self._phrase_match(p, d) for p in phrases)}
+            if doc_filter:
+                candidates = {d for d in candidates if doc_filter(d)}
+
+            n_docs = len(self.doc_lengths)
+            avg_len = self.total_length / n_docs if n_docs else 1
+            weights = [(self.postings[t], self._idf(t, n_docs)) for t in terms]
+            # نحتاج فقط أفضل offset+limit نتيجة، لا ترتيب كل النتائج
+            ranked = heapq.nsmallest(
+                offset + limit,
+                ((-self._score(weights, d, avg_len), d) for d in candidates)
+            )
+        return [(doc_id, -score) for score, doc_id in ranked[offset:offset + limit]], len(candidates)
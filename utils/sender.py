@@ -0,0 +1,198 @@
+import heapq
+import itertools
+import threading
+import time
+from telebot.apihelper import ApiTelegramException
+
+# 📤 طابور إرسال موحد يحترم حدود تيليجرام
+# ~30 رسالة/ث إجمالًا، رسالة/ث لكل محادثة، 20 رسالة/دقيقة لكل مجموعة
+GLOBAL_RATE = 30
+CHAT_RATE = 1
+GROUP_RATE = 20 / 60.0
+MAX_ATTEMPTS = 5
+WORKERS = 4
+
+# الأولوية الأصغر تُرسل أولًا
+PRIORITY_REMINDER = 0
+PRIORITY_NOTIFY = 1
+PRIORITY_BROADCAST = 2
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    # كم ثانية يجب الانتظار قبل أن يتوفر رمز (0 = متاح الآن)
+    def wait_time(self, now):
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def idle(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+class SendJob:
+    def __init__(self, method, chat_id, args, kwargs, priority, on_done=None):
+        self.method = method
+        self.chat_id = chat_id
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.on_done = on_done
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self._done.set()
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                print(f"[ERROR] معالجة نتيجة الإرسال إلى {self.chat_id}: {e}")
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.error is None and self._done.is_set()
+
+    @property
+    def ok(self):
+        return self._done.is_set() and self.error is None
+
+
+def retry_after(error):
+    if isinstance(error, ApiTelegramException) and error.error_code == 429:
+        params = (error.result_json or {}).get("parameters") or {}
+        return params.get("retry_after", 1)
+    return None
+
+
+class SendQueue:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.bot = None
+        self._ready = []
+        self._delayed = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._global = TokenBucket(GLOBAL_RATE)
+        self._chats = {}
+        self.stats = {"sent": 0, "failed": 0, "retried": 0}
+
+    def start(self, bot):
+        self.bot = bot
+        for _ in range(self.workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+        return self
+
+    # ✅ إضافة رسالة للطابور: method اسم دالة telebot مثل send_message
+    def submit(self, method, chat_id, *args, priority=PRIORITY_NOTIFY, on_done=None, **kwargs):
+        job = SendJob(method, chat_id, args, kwargs, priority, on_done)
+        with self._cond:
+            heapq.heappush(self._ready, (priority, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def pending(self):
+        with self._cond:
+            return len(self._ready) + len(self._delayed)
+
+    def _chat_bucket(self, chat_id, now):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 10000:
+                for key in [k for k, b in self._chats.items() if b.idle(now)]:
+                    del self._chats[key]
+            rate = GROUP_RATE if isinstance(chat_id, int) and chat_id < 0 else CHAT_RATE
+            bucket = self._chats[chat_id] = TokenBucket(rate, capacity=1)
+        return bucket
+
+    def _delay(self, job, seconds):
+        heapq.heappush(self._delayed, (time.monotonic() + seconds, job.priority, next(self._seq), job))
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, priority, seq, job = heapq.heappop(self._delayed)
+                    heapq.heappush(self._ready, (priority, seq, job))
+
+                timeout = None
+                if self._delayed:
+                    timeout = self._delayed[0][0] - now
+
+                if self._ready:
+                    global_wait = self._global.wait_time(now)
+                    if global_wait > 0:
+                        timeout = global_wait if timeout is None else min(timeout, global_wait)
+                    else:
+                        _, _, job = heapq.heappop(self._ready)
+                        bucket = self._chat_bucket(job.chat_id, now)
+                        chat_wait = bucket.wait_time(now)
+                        if chat_wait > 0:
+                            self._delay(job, chat_wait)
+                            continue
+                        bucket.take(now)
+                        self._global.take(now)
+                        return job
+
+                self._cond.wait(timeout)
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            job.attempts += 1
+            try:
+                result = getattr(self.bot, job.method)(job.chat_id, *job.args, **job.kwargs)
+            except Exception as e:
+                wait = retry_after(e)
+                if wait is not None and job.attempts < MAX_ATTEMPTS:
+                    # 429: حد تيليجرام على البوت كله، فنوقف الدلو العام ودلو المحادثة حتى retry_after
+                    with self._cond:
+                        self._chat_bucket(job.chat_id, time.monotonic()).block(wait)
+                        self._global.block(wait)
+                        self._delay(job, wait)
+                        self.stats["retried"] += 1
+                        self._cond.notify()
+                    continue
+                with self._cond:
+                    self.stats["failed"] += 1
+                if not job.on_done:
+                    print(f"[ERROR] {job.method} إلى {job.chat_id}: {e}")
+                job.finish(error=e)
+                continue
+            with self._cond:
+                self.stats["sent"] += 1
+            job.finish(result=result)
+
+
+sender = SendQueue()
+
+
+def send(method, chat_id, *args, priority=PRIORITY_NOTIFY, on_done=None, **kwargs):
+    return sender.submit(method, chat_id, *args, priority=priority, on_done=on_done, **kwargs)
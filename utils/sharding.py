@@ -0,0 +1,83 @@
+import os
+import socket
+import threading
+import time
+import hashlib
+from datetime import datetime, timedelta
+from uuid import uuid4
+from utils.db import db
+
+replicas_col = db["replicas"]
+
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+HEARTBEAT_SECONDS = 10
+LEASE_SECONDS = 30
+
+
+def _score(member, user_id):
+    digest = hashlib.blake2b(f"{member}:{user_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+# 🧩 توزيع المستخدمين على النسخ العاملة (Rendezvous hashing)
+# كل نسخة تجدد عقدها في مجموعة replicas، والنسخة التي لا تجدده تخرج تلقائيًا
+class Membership:
+    def __init__(self, replica_id=REPLICA_ID):
+        self.replica_id = replica_id
+        self.members = [replica_id]
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def on_change(self, callback):
+        self._listeners.append(callback)
+
+    def owner_of(self, user_id):
+        with self._lock:
+            members = self.members
+        return max(members, key=lambda m: _score(m, user_id))
+
+    def owns(self, user_id):
+        return self.owner_of(user_id) == self.replica_id
+
+    def heartbeat(self):
+        now = datetime.utcnow()
+        replicas_col.update_one(
+            {"_id": self.replica_id},
+            {"$set": {"expires_at": now + timedelta(seconds=LEASE_SECONDS), "host": socket.gethostname()}},
+            upsert=True
+        )
+        live = sorted(doc["_id"] for doc in replicas_col.find({"expires_at": {"$gt": now}}, {"_id": 1}))
+        if self.replica_id not in live:
+            live = sorted(live + [self.replica_id])
+
+        with self._lock:
+            changed = live != self.members
+            self.members = live
+        if changed:
+            print(f"ℹ️ النسخ العاملة: {len(live)} ({', '.join(live)})")
+            for callback in self._listeners:
+                try:
+                    callback(live)
+                except Exception as e:
+                    print(f"[ERROR] إعادة توزيع المستخدمين: {e}")
+
+    def leave(self):
+        replicas_col.delete_one({"_id": self.replica_id})
+
+    def start(self):
+        replicas_col.create_index("expires_at", expireAfterSeconds=0)
+        self.heartbeat()
+
+        def loop():
+            while True:
+                time.sleep(HEARTBEAT_SECONDS)
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"[ERROR] نبضة النسخة {self.replica_id}: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+        return self
+
+
+membership = Membership()
@@ -0,0 +1,69 @@
+import threading
+from datetime import datetime, timedelta
+from math import floor
+from pytz import utc
+from config import PRAYER_METHOD, PRAYER_GRID_DEG
+from utils.prayer_times import get_timings, resolve_timezone, localize
+
+# 🗂️ جدول أوقات مشترك لكل خلية شبكة (lat/lon) + طريقة الحساب + التاريخ المحلي
+_cache = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_next_purge = [datetime.min.replace(tzinfo=utc)]
+
+
+def grid_cell(lat, lon, cell_deg=PRAYER_GRID_DEG):
+    return int(floor(float(lat) / cell_deg)), int(floor(float(lon) / cell_deg))
+
+
+def _cell_center(cell, cell_deg=PRAYER_GRID_DEG):
+    return (cell[0] + 0.5) * cell_deg, (cell[1] + 0.5) * cell_deg
+
+
+# ⏳ منتصف الليل المحلي التالي لليوم المعطى (بتوقيت UTC)
+def _local_midnight_after(day, user_tz):
+    midnight = datetime(day.year, day.month, day.day) + timedelta(days=1)
+    return localize(user_tz, midnight).astimezone(utc)
+
+
+def _purge_expired(now):
+    if now < _next_purge[0]:
+        return
+    _next_purge[0] = now + timedelta(minutes=10)
+    for key in [k for k, (expires_at, _) in _cache.items() if expires_at <= now]:
+        del _cache[key]
+
+
+# ✅ أوقات اليوم من الذاكرة، وتُحسب مرة واحدة لكل خلية في اليوم
+def get_timings_cached(lat, lon, day, tz_name, method=PRAYER_METHOD):
+    cell = grid_cell(lat, lon)
+    user_tz = resolve_timezone(tz_name, lon)
+    key = (cell, str(user_tz), method, day)
+    now = datetime.now(utc)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now:
+            _stats["hits"] += 1
+            return entry[1]
+        _stats["misses"] += 1
+
+    center_lat, center_lon = _cell_center(cell)
+    timings = get_timings(center_lat, center_lon, day, tz_name, method)
+
+    with _lock:
+        _purge_expired(now)
+        _cache[key] = (_local_midnight_after(day, user_tz), timings)
+    return timings
+
+
+def cache_stats():
+    with _lock:
+        total = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "size": len(_cache),
+            "hit_ratio": (_stats["hits"] / total) if total else 0.0,
+            "cell_deg": PRAYER_GRID_DEG
+        }
@@ -0,0 +1,100 @@
+import os
+import threading
+from math import cos, radians, floor
+
+try:
+    from timezonefinder import TimezoneFinder
+except ImportError:
+    TimezoneFinder = None
+
+# 🌍 تحديد المنطقة الزمنية من الإحداثيات بدون اتصال بالشبكة
+# الأساس: حدود المناطق الفعلية (timezonefinder)، وعند غيابها أقرب نقطة مرجعية
+# (zone.tab + مدن إضافية) عبر فهرس شبكي بخلايا 5 درجات — تقريبية قرب الحدود
+POINTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tz_points.tsv")
+CELL_DEG = 5.0
+
+# أبعد من هذه المسافة (كم) نعتبر الموقع في البحر ونستخدم منطقة Etc/GMT حسب خط الطول
+MAX_DISTANCE_KM = 1500
+
+_grid = None
+_finder = None
+_finder_lock = threading.Lock()
+
+
+def _load_grid():
+    grid = {}
+    with open(POINTS_FILE, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            lat, lon, zone = line.rstrip("\n").split("\t")
+            lat, lon = float(lat), float(lon)
+            grid.setdefault(_cell(lat, lon), []).append((lat, lon, zone))
+    return grid
+
+
+def _cell(lat, lon):
+    return int(floor(lat / CELL_DEG)), int(floor(lon / CELL_DEG))
+
+
+def _distance_km(lat1, lon1, lat2, lon2):
+    dlon = abs(lon1 - lon2)
+    if dlon > 180:
+        dlon = 360 - dlon
+    x = dlon * cos(radians((lat1 + lat2) / 2))
+    y = lat1 - lat2
+    return 111.2 * (x * x + y * y) ** 0.5
+
+
+def _nautical_zone(lon):
+    offset = int(round(lon / 15.0))
+    if offset == 0:
+        return "Etc/GMT"
+    # إشارة Etc/GMT معكوسة في tzdata
+    return f"Etc/GMT{'-' if offset > 0 else '+'}{abs(offset)}"
+
+
+def _polygon_zone(lat, lon):
+    global _finder
+    with _finder_lock:
+        if _finder is None:
+            _finder = TimezoneFinder(in_memory=True)
+        return _finder.timezone_at(lng=lon, lat=lat)
+
+
+# ✅ المنطقة الزمنية للإحداثيات
+def timezone_at(lat, lon):
+    lat, lon = float(lat), float(lon)
+    if TimezoneFinder is not None:
+        zone = _polygon_zone(lat, lon)
+        if zone:
+            return zone
+    return _nearest_zone(lat, lon)
+
+
+def _nearest_zone(lat, lon):
+    global _grid
+    if _grid is None:
+        _grid = _load_grid()
+
+    row, col = _cell(lat, lon)
+    cols = int(360 / CELL_DEG)
+    best, best_dist = None, None
+
+    # توسيع الحلقات حتى تصبح أقرب حلقة أبعد من أفضل نقطة
+    for ring in range(0, int(MAX_DISTANCE_KM / 111.2 / CELL_DEG) + 2):
+        if best_dist is not None and (ring - 1) * CELL_DEG * 111.2 * cos(radians(min(abs(lat) + ring * CELL_DEG, 89))) > best_dist:
+            break
+        for dr in range(-ring, ring + 1):
+            for dc in range(-ring, ring + 1):
+                if max(abs(dr), abs(dc)) != ring:
+                    continue
+                c = (col + dc + cols // 2) % cols - cols // 2
+                for p_lat, p_lon, zone in _grid.get((row + dr, c), ()):
+                    d = _distance_km(lat, lon, p_lat, p_lon)
+                    if best_dist is None or d < best_dist:
+                        best, best_dist = zone, d
+
+    if best is None or best_dist > MAX_DISTANCE_KM:
+        return _nautical_zone(lon)
+    return best